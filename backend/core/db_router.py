@@ -0,0 +1,73 @@
+"""
+Primary/replica database routing.
+
+Writes always go to 'default' (the primary). Reads go to a replica only while
+ReplicaRoutingMiddleware has marked the current request as a safe (GET/HEAD)
+request, so management commands, shells and write requests keep reading the
+primary. After a user writes, a short-lived cookie pins their reads to the
+primary for REPLICA_PIN_SECONDS, so e.g. a board drag saved through
+bulk_update_order is not "reverted" by the next 2-second poll hitting a
+replica that has not caught up yet.
+
+Sessions, auth and content types always read the primary: the middleware runs
+before authentication, and a session or user row that has not reached a
+replica yet would log the user out for the length of the lag.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_pin_primary'
+PRIMARY_ONLY_APPS = {'sessions', 'auth', 'contenttypes'}
+
+_replica_reads_allowed = ContextVar('replica_reads_allowed', default=False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'REPLICA_DATABASES', [])
+        if not replicas or not _replica_reads_allowed.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction on the primary must see its uncommitted writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data, so objects loaded from different ones can be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas carry the same schema (migrated directly for local SQLite stand-ins)
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in SAFE_METHODS
+        token = _replica_reads_allowed.set(safe and PIN_COOKIE not in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads_allowed.reset(token)
+
+        if not safe:
+            # Read-your-writes: keep this client on the primary until replicas have caught up
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        return response
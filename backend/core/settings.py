@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,6 +86,25 @@ DATABASES = {
     }
 }
 
+# Read replicas: GET/HEAD requests read from these, everything else uses 'default'.
+# Locally, two SQLite files can stand in for primary and replica:
+#   DJANGO_REPLICA_DBS=db_replica.sqlite3 python manage.py sync_replica
+REPLICA_DATABASES = []
+for i, name in enumerate(filter(None, os.environ.get('DJANGO_REPLICA_DBS', '').split(','))):
+    alias = f'replica{i + 1}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        # Tests run against the primary only
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# After a write, that client's reads stay on the primary for this long (replication lag budget)
+REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -143,3 +164,11 @@ CSRF_TRUSTED_ORIGINS = [
     
 ]
 
+
+# Issues that have been DONE for longer than this are moved off the board by `manage.py archive_issues`
+ISSUE_ARCHIVE_AFTER_DAYS = 30
+
+# Notification digests (manage.py send_notifications). Local stand-ins:
+#   'issues.notifications.ConsoleBackend' (stdout) or 'issues.notifications.FileBackend' (NOTIFICATION_FILE_PATH)
+NOTIFICATION_BACKEND = 'issues.notifications.ConsoleBackend'
+NOTIFICATION_FILE_PATH = BASE_DIR / 'notifications.log'
@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.conf import settings # <--- Import
 from django.conf.urls.static import static # <--- Import
 from rest_framework.routers import DefaultRouter
-from issues.views import ProjectViewSet, IssueViewSet, register, CommentViewSet, UserViewSet, custom_login, custom_logout, SubtaskViewSet, AttachmentViewSet # <--- Import AttachmentViewSet
+from issues.views import ProjectViewSet, IssueViewSet, register, CommentViewSet, UserViewSet, custom_login, custom_logout, SubtaskViewSet, AttachmentViewSet, SavedFilterViewSet, ProjectDeletionViewSet, NotificationViewSet # <--- Import AttachmentViewSet
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet)
@@ -12,6 +12,9 @@ router.register(r'comments', CommentViewSet)
 router.register(r'users', UserViewSet)
 router.register(r'subtasks', SubtaskViewSet)
 router.register(r'attachments', AttachmentViewSet) # <--- Register new route
+router.register(r'filters', SavedFilterViewSet)
+router.register(r'project-deletions', ProjectDeletionViewSet)
+router.register(r'notifications', NotificationViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
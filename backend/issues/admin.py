@@ -1,26 +1,136 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .deletion import request_project_deletion
+from .hierarchy import ancestors_of, refresh_done_rollups
 from .models import Project, Issue, Comment
+from .notifications import watch_issues
+
+
+class EstimatedCountPaginator(Paginator):
+    # COUNT(*) on a multi-million row table is a full scan. Unfiltered changelists use the
+    # database's row estimate; filtered ones count at most COUNT_CAP rows.
+    # Estimates come from table statistics and can be an upper bound after bulk deletes:
+    # trailing pages then render empty rather than erroring.
+    COUNT_CAP = 10000
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if not query.where:
+            estimate = estimated_row_count(self.object_list.model, self.object_list.db)
+            if estimate is not None:
+                return estimate
+        return self.object_list[:self.COUNT_CAP].count()
+
+
+def estimated_row_count(model, using):
+    """Cheap approximate row count for `model`'s table, or None if the backend has no estimate."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute("SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        elif connection.vendor == 'sqlite':
+            # sqlite_stat1 only exists once ANALYZE has run; without it, fall back to the capped COUNT
+            if 'sqlite_stat1' not in connection.introspection.table_names(cursor):
+                return None
+            # Each row's stat starts with the table's row count as of the last ANALYZE
+            cursor.execute("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) Django runs for the "N total" link
+    show_full_result_count = False
+
+
+class RecentProjectFilter(admin.SimpleListFilter):
+    # list_filter = ('project',) renders every project; this lists only the newest few.
+    # Any other project can still be picked with ?project=<KEY> in the URL.
+    title = 'project'
+    parameter_name = 'project'
+    LIMIT = 20
+
+    def lookups(self, request, model_admin):
+        projects = Project.objects.filter(deleted_at__isnull=True)
+        recent = list(projects.order_by('-id').values_list('key', 'name')[:self.LIMIT])
+        selected = self.value()
+        if selected and selected not in [key for key, _ in recent]:
+            recent += list(projects.filter(key=selected).values_list('key', 'name'))
+        return recent
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(project__key=self.value())
+        return queryset
+
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ('name', 'key', 'owner', 'created_at')
+    list_select_related = ('owner',)
     search_fields = ('name', 'key')
-    # Use raw_id_fields if you have thousands of users, 
-    # but for a team tool, a dropdown is fine.
+    # Dropdowns would list every user; autocomplete searches them instead
+    autocomplete_fields = ('owner', 'members')
+
+    # Deleting goes through the background path (deletion.py), never Django's in-Python collector
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(deleted_at__isnull=True)
+
+    def get_deleted_objects(self, objs, request):
+        # The stock confirmation page walks every related row; just list the projects
+        objs = list(objs)
+        summary = {'projects': len(objs)}
+        return [f"{obj} (issues are removed in the background)" for obj in objs], summary, set(), []
+
+    def delete_model(self, request, obj):
+        request_project_deletion(obj, request.user)
+
+    def delete_queryset(self, request, queryset):
+        for project in queryset:
+            request_project_deletion(project, request.user)
+
+
+class IssueActionForm(admin.helpers.ActionForm):
+    # Used by the "Reassign" action; a username rather than a dropdown of every user
+    assignee = forms.CharField(required=False, label='Assign to (username)')
+
 
 @admin.register(Issue)
-class IssueAdmin(admin.ModelAdmin):
+class IssueAdmin(LargeTableAdmin):
     # 'key' is the property we defined in the model (e.g., PROJ-101)
     list_display = ('key', 'title', 'status', 'priority', 'assignee', 'updated_at')
+    # 'key' reads project, and assignee is shown: fetch both in the changelist query
+    list_select_related = ('project', 'assignee')
+    # Newest first, using the primary key index
+    ordering = ('-id',)
     
     # Filter sidebar on the right
-    list_filter = ('project', 'status', 'priority', 'issue_type')
+    list_filter = (RecentProjectFilter, 'status', 'priority', 'issue_type')
     
     # Search by title or the computed key
     search_fields = ('title', 'description')
+
+    autocomplete_fields = ('project', 'assignee', 'reporter')
     
     # Don't let admins manually mess with the auto-increment ID
-    readonly_fields = ('key_id', 'created_at', 'updated_at')
+    readonly_fields = ('key_id', 'created_at', 'updated_at', 'resolved_at', 'archived_at')
 
     # Organize the layout slightly for better readability
     fieldsets = (
@@ -34,13 +144,75 @@ class IssueAdmin(admin.ModelAdmin):
             'fields': ('assignee', 'reporter')
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at')
+            'fields': ('created_at', 'updated_at', 'resolved_at', 'archived_at')
         }),
     )
 
+    # Bulk actions: each runs as one UPDATE over the selection (including "select all"),
+    # so they skip Issue.save() and do not create notification events.
+    action_form = IssueActionForm
+    actions = ['reassign', 'mark_todo', 'mark_in_progress', 'mark_review', 'mark_done', 'archive']
+
+    @admin.action(description='Reassign selected issues (enter a username below)')
+    def reassign(self, request, queryset):
+        username = request.POST.get('assignee', '').strip()
+        if not username:
+            assignee = None
+        else:
+            assignee = User.objects.filter(username=username).first()
+            if assignee is None:
+                self.message_user(request, f"No user named {username!r}", messages.ERROR)
+                return
+        with transaction.atomic():
+            if assignee is not None:
+                # Issue.save() makes a new assignee a watcher; the bulk UPDATE has to do it here.
+                # Runs first: the selection may be filtered on the assignee being changed
+                watch_issues(queryset.exclude(assignee=assignee), assignee.id)
+            updated = queryset.update(assignee=assignee, updated_at=timezone.now())
+        self.message_user(request, f"{updated} issue(s) assigned to {username or 'nobody'}")
+
+    def set_status(self, request, queryset, status):
+        now = timezone.now()
+        if status == Issue.Status.DONE:
+            # Same bookkeeping as Issue.save(): keep an existing resolved_at, else stamp it now
+            fields = {'resolved_at': Coalesce('resolved_at', Value(now))}
+        else:
+            fields = {'resolved_at': None, 'archived_at': None}
+        # Collected first: the selection may be filtered on the status being changed
+        ancestors = ancestors_of(queryset)
+        updated = queryset.update(status=status, updated_at=now, **fields)
+        refresh_done_rollups(ancestors)
+        self.message_user(request, f"{updated} issue(s) moved to {Issue.Status(status).label}")
+
+    @admin.action(description='Move selected issues to To Do')
+    def mark_todo(self, request, queryset):
+        self.set_status(request, queryset, Issue.Status.TODO)
+
+    @admin.action(description='Move selected issues to In Progress')
+    def mark_in_progress(self, request, queryset):
+        self.set_status(request, queryset, Issue.Status.IN_PROGRESS)
+
+    @admin.action(description='Move selected issues to In Review')
+    def mark_review(self, request, queryset):
+        self.set_status(request, queryset, Issue.Status.REVIEW)
+
+    @admin.action(description='Move selected issues to Done')
+    def mark_done(self, request, queryset):
+        self.set_status(request, queryset, Issue.Status.DONE)
+
+    @admin.action(description='Archive selected issues (Done only)')
+    def archive(self, request, queryset):
+        updated = queryset.filter(status=Issue.Status.DONE, archived_at__isnull=True).update(archived_at=timezone.now())
+        self.message_user(request, f"{updated} issue(s) archived")
+
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('issue', 'author', 'short_text', 'created_at')
+    # str(issue) goes through issue.key -> project, so fetch the whole chain at once
+    list_select_related = ('issue__project', 'author')
+    ordering = ('-id',)
+    raw_id_fields = ('issue',)
+    autocomplete_fields = ('author',)
 
     def short_text(self, obj):
-        return obj.text[:50] + "..." if len(obj.text) > 50 else obj.text
\ No newline at end of file
+        return obj.text[:50] + "..." if len(obj.text) > 50 else obj.text
@@ -0,0 +1,124 @@
+"""
+Repeatable API benchmark scenarios, run through the Django test client.
+
+Each scenario is a callable taking (client, ctx) and returning the response.
+`ctx` holds ids picked from the seeded dataset. Used by `manage.py benchmark_api`.
+"""
+import json
+import random
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .models import Project, Issue
+
+
+def board_list(client, ctx):
+    return client.get(f"/api/issues/?project={ctx['project_id']}")
+
+
+def issue_detail(client, ctx):
+    return client.get(f"/api/issues/{ctx['rng'].choice(ctx['issue_ids'])}/")
+
+
+def reorder(client, ctx):
+    # Same payload shape Board.jsx sends after a drag: every card in the touched column
+    ids = ctx['column_ids'][:]
+    ctx['rng'].shuffle(ids)
+    payload = {'issues': [{'id': pk, 'order': n} for n, pk in enumerate(ids)]}
+    return client.post('/api/issues/bulk_update_order/', json.dumps(payload), content_type='application/json')
+
+
+def comment_create(client, ctx):
+    payload = {'issue': ctx['rng'].choice(ctx['issue_ids']), 'text': 'Benchmark comment'}
+    return client.post('/api/comments/', json.dumps(payload), content_type='application/json')
+
+
+def dashboard(client, ctx):
+    # Dashboard.jsx loads the project list, then every issue of the selected project
+    client.get('/api/projects/')
+    return client.get(f"/api/issues/?project={ctx['project_id']}")
+
+
+SCENARIOS = {
+    'board_list': board_list,
+    'issue_detail': issue_detail,
+    'reorder': reorder,
+    'comment_create': comment_create,
+    'dashboard': dashboard,
+}
+
+
+def build_context(user, seed=0):
+    project = Project.objects.filter(owner=user).order_by('id').first()
+    issue_ids = list(Issue.objects.filter(project=project).values_list('id', flat=True))
+    column_ids = list(
+        Issue.objects.filter(project=project, status=Issue.Status.TODO).values_list('id', flat=True)
+    )
+    return {
+        'project_id': project.id,
+        'issue_ids': issue_ids,
+        'column_ids': column_ids,
+        'rng': random.Random(seed),
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def run_scenario(client, ctx, func, iterations, warmup=2):
+    """Run one scenario and return p50/p95 latency (ms) and queries per call."""
+    for _ in range(warmup):
+        func(client, ctx)
+
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        # Count queries on every alias, so reads routed to replicas are included
+        with ExitStack() as stack:
+            captured = []
+            for conn in connections.all():
+                # Board lists can run thousands of queries; start each capture from an empty log
+                conn.queries_log.clear()
+                captured.append(stack.enter_context(CaptureQueriesContext(conn)))
+            started = time.perf_counter()
+            response = func(client, ctx)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{func.__name__} returned HTTP {response.status_code}")
+        queries = max(queries, sum(len(c) for c in captured))
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'queries': queries,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms=5.0):
+    """Return a list of (scenario, message) for results that regressed against the baseline.
+
+    Query counts must not grow at all. Latency is only checked for scenarios whose
+    baseline has a p95 (recorded on this machine), and only counts as a regression
+    when it grows by more than `tolerance` (0.2 = 20%) and by more than `min_delta_ms`,
+    so jitter on millisecond-scale requests does not fail the run.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if 'queries' in previous and current['queries'] > previous['queries']:
+            regressions.append((name, f"queries {previous['queries']} -> {current['queries']}"))
+        if 'p95_ms' in previous:
+            slower = current['p95_ms'] - previous['p95_ms']
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance) and slower > min_delta_ms:
+                regressions.append((name, f"p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"))
+    return regressions
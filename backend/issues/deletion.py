@@ -0,0 +1,169 @@
+"""
+Chunked deletion of projects and issues.
+
+Django's delete() collects every related row in Python and removes them in
+one transaction, which for a project with 100k issues means millions of
+objects in memory and a write lock held for the whole request. Here rows are
+removed with plain DELETE ... WHERE issue_id IN (...) statements, a bounded
+batch of issues per transaction, and attachment files are removed from
+storage once the rows referencing them are committed.
+"""
+import time
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    Project, Issue, IssueClosure, Comment, Subtask, Attachment, SavedFilter, ProjectDeletion,
+    Watcher, NotificationEvent, Notification,
+)
+
+# (model, column) pairs that reference an issue and go before it
+ISSUE_CHILDREN = [
+    (Notification, 'issue_id'),
+    (NotificationEvent, 'issue_id'),
+    (Watcher, 'issue_id'),
+    (Comment, 'issue_id'),
+    (Subtask, 'issue_id'),
+    (Attachment, 'issue_id'),
+    (IssueClosure, 'ancestor_id'),
+    (IssueClosure, 'descendant_id'),
+]
+
+# How long a RUNNING job may go without a heartbeat before another worker takes it over
+DELETION_LEASE = timedelta(minutes=5)
+
+
+def raw_delete(model, column, ids):
+    """DELETE rows of `model` whose `column` is in `ids`, without loading them. Returns the row count."""
+    if not ids:
+        return 0
+    qn = connection.ops.quote_name
+    sql = 'DELETE FROM {} WHERE {} IN ({})'.format(
+        qn(model._meta.db_table), qn(column), ', '.join(['%s'] * len(ids)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(ids))
+        return cursor.rowcount
+
+
+def purge_issues(ids):
+    """Delete issues `ids` and everything hanging off them.
+
+    Returns (issues deleted, child rows deleted, attachment file names).
+    """
+    files = list(Attachment.objects.filter(issue_id__in=ids).values_list('file', flat=True))
+    rows = sum(raw_delete(model, column, ids) for model, column in ISSUE_CHILDREN)
+    # Children outside this batch lose their parent, as on_delete=SET_NULL would do
+    Issue.objects.filter(parent_id__in=ids).exclude(id__in=ids).update(parent=None)
+    issues = raw_delete(Issue, 'id', ids)
+    return issues, rows, files
+
+
+def remove_files(names):
+    removed = 0
+    for name in names:
+        if name:
+            default_storage.delete(name)
+            removed += 1
+    return removed
+
+
+def delete_issue(issue):
+    """Delete one issue through the raw path; its attachment files go once the transaction commits."""
+    from .hierarchy import move
+    with transaction.atomic():
+        if issue.parent_id is not None:
+            # Same bookkeeping as the pre_delete signal, which raw deletes don't fire
+            move(issue, issue.parent_id, None)
+        _, _, files = purge_issues([issue.pk])
+        transaction.on_commit(lambda: remove_files(files))
+
+
+def request_project_deletion(project, user):
+    """Hide `project` right away and queue its rows for process_deletions."""
+    with transaction.atomic():
+        Project.objects.filter(pk=project.pk).update(deleted_at=timezone.now())
+        return ProjectDeletion.objects.create(
+            project_id=project.pk,
+            project_key=project.key,
+            project_name=project.name,
+            requested_by=user,
+            total_issues=Issue.objects.filter(project_id=project.pk).count(),
+        )
+
+
+class LeaseLost(Exception):
+    """Another worker claimed the deletion job after this one's lease ran out."""
+
+
+def claim_project_deletion(job, lease=DELETION_LEASE):
+    """Atomically mark `job` RUNNING for the caller. Returns the lease (its heartbeat), or None if another worker holds it."""
+    now = timezone.now()
+    claimed = ProjectDeletion.objects.filter(pk=job.pk).filter(
+        Q(status=ProjectDeletion.Status.PENDING)
+        | Q(status=ProjectDeletion.Status.RUNNING, heartbeat_at__isnull=True)
+        | Q(status=ProjectDeletion.Status.RUNNING, heartbeat_at__lt=now - lease)
+    ).update(status=ProjectDeletion.Status.RUNNING, heartbeat_at=now)
+    return now if claimed else None
+
+
+def renew_lease(job, beat, **fields):
+    """Move the heartbeat forward if `beat` is still the current one; raises LeaseLost otherwise."""
+    now = timezone.now()
+    renewed = ProjectDeletion.objects.filter(
+        pk=job.pk, status=ProjectDeletion.Status.RUNNING, heartbeat_at=beat,
+    ).update(heartbeat_at=now, **fields)
+    if not renewed:
+        raise LeaseLost(job.pk)
+    return now
+
+
+def run_project_deletion(job, batch_size=500, sleep=0.0, lease=DELETION_LEASE):
+    """Delete job's project in batches of `batch_size` issues, recording progress after each batch.
+
+    Returns False without doing anything if another worker holds the job. Safe to
+    re-run after a crash: each batch is committed on its own, and once the lease
+    runs out the next run simply picks up whatever issues are left.
+    """
+    beat = claim_project_deletion(job, lease)
+    if beat is None:
+        return False
+    try:
+        while True:
+            ids = list(
+                Issue.objects.filter(project_id=job.project_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                # Renewing first locks the job row, so a worker that lost the lease rolls its batch back
+                renewed = renew_lease(job, beat)
+                issues, rows, files = purge_issues(ids)
+                ProjectDeletion.objects.filter(pk=job.pk).update(
+                    deleted_issues=F('deleted_issues') + issues,
+                    deleted_rows=F('deleted_rows') + rows,
+                )
+            # Only once committed: a rolled-back batch leaves the stored heartbeat as it was
+            beat = renewed
+            removed = remove_files(files)
+            ProjectDeletion.objects.filter(pk=job.pk).update(deleted_files=F('deleted_files') + removed)
+            if sleep:
+                time.sleep(sleep)
+
+        with transaction.atomic():
+            renew_lease(job, beat, status=ProjectDeletion.Status.DONE, finished_at=timezone.now())
+            raw_delete(Project.members.through, 'project_id', [job.project_id])
+            raw_delete(SavedFilter, 'project_id', [job.project_id])
+            raw_delete(Project, 'id', [job.project_id])
+    except LeaseLost:
+        return False
+    except Exception as e:
+        ProjectDeletion.objects.filter(pk=job.pk, heartbeat_at=beat).update(
+            status=ProjectDeletion.Status.FAILED, error=str(e),
+        )
+        raise
+    return True
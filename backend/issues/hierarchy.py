@@ -0,0 +1,126 @@
+"""
+Parent/child issue hierarchy (epic -> story -> task) stored as a closure table.
+
+IssueClosure holds one row per (ancestor, descendant) pair, self-pairs
+excluded, so "all descendants" or "all ancestors" is a single indexed lookup
+at any depth. Each issue also carries rollup_total / rollup_done, the number
+of descendants and how many of them are DONE; these are adjusted with F()
+updates whenever an issue is re-parented, changes status, or is deleted,
+instead of being recounted.
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Issue, IssueClosure
+
+# Lower rank sits higher in the tree: an epic can hold stories and tasks, a story can hold tasks and bugs
+TYPE_RANK = {
+    Issue.IssueType.EPIC: 0,
+    Issue.IssueType.STORY: 1,
+    Issue.IssueType.TASK: 2,
+    Issue.IssueType.BUG: 2,
+}
+
+
+class HierarchyError(ValueError):
+    pass
+
+
+def check_parent(issue, parent):
+    """Raise HierarchyError if `parent` cannot hold `issue`."""
+    if parent is None:
+        return
+    if parent.project_id != issue.project_id:
+        raise HierarchyError("Parent must be in the same project")
+    if TYPE_RANK[parent.issue_type] >= TYPE_RANK[issue.issue_type]:
+        raise HierarchyError(f"{parent.get_issue_type_display()} issues cannot contain {issue.get_issue_type_display()} issues")
+    if issue.pk and (parent.pk == issue.pk or IssueClosure.objects.filter(ancestor_id=issue.pk, descendant_id=parent.pk).exists()):
+        raise HierarchyError("An issue cannot be moved under itself or one of its descendants")
+
+
+def check_children(issue, issue_type, project_id):
+    """Raise HierarchyError if `issue` cannot change to `issue_type` / `project_id` with its current children.
+
+    Only direct children are checked: deeper levels are already ranked below them.
+    """
+    children = list(issue.children.values_list('issue_type', flat=True).distinct())
+    if not children:
+        return
+    if project_id != issue.project_id:
+        raise HierarchyError("Issues with children cannot be moved to another project")
+    for child_type in children:
+        if TYPE_RANK[issue_type] >= TYPE_RANK[child_type]:
+            raise HierarchyError(
+                f"{Issue.IssueType(issue_type).label} issues cannot contain {Issue.IssueType(child_type).label} issues"
+            )
+
+
+def ancestor_ids(issue_id):
+    return IssueClosure.objects.filter(descendant_id=issue_id).values('ancestor_id')
+
+
+def descendants(issue):
+    return Issue.objects.filter(ancestor_links__ancestor=issue)
+
+
+def move(issue, old_parent_id, new_parent_id):
+    """Re-link `issue` and its whole subtree from old_parent_id to new_parent_id (either may be None)."""
+    subtree = [(issue.pk, 0)] + list(
+        IssueClosure.objects.filter(ancestor_id=issue.pk).values_list('descendant_id', 'depth')
+    )
+    subtree_ids = [pk for pk, _ in subtree]
+    size = len(subtree)
+    done = Issue.objects.filter(id__in=subtree_ids, status=Issue.Status.DONE).count()
+
+    if old_parent_id is not None:
+        old_ancestors = list(ancestor_ids(issue.pk).values_list('ancestor_id', flat=True))
+        IssueClosure.objects.filter(descendant_id__in=subtree_ids, ancestor_id__in=old_ancestors).delete()
+        Issue.objects.filter(id__in=old_ancestors).update(
+            rollup_total=F('rollup_total') - size, rollup_done=F('rollup_done') - done,
+        )
+
+    if new_parent_id is not None:
+        new_ancestors = [(new_parent_id, 0)] + list(
+            IssueClosure.objects.filter(descendant_id=new_parent_id).values_list('ancestor_id', 'depth')
+        )
+        IssueClosure.objects.bulk_create([
+            IssueClosure(ancestor_id=a, descendant_id=d, depth=a_depth + 1 + d_depth)
+            for a, a_depth in new_ancestors
+            for d, d_depth in subtree
+        ], batch_size=1000)
+        Issue.objects.filter(id__in=[a for a, _ in new_ancestors]).update(
+            rollup_total=F('rollup_total') + size, rollup_done=F('rollup_done') + done,
+        )
+
+
+def status_changed(issue, was_done):
+    """Keep every ancestor's rollup_done in step when `issue` enters or leaves DONE."""
+    is_done = issue.status == Issue.Status.DONE
+    if was_done == is_done:
+        return
+    delta = 1 if is_done else -1
+    Issue.objects.filter(id__in=ancestor_ids(issue.pk)).update(rollup_done=F('rollup_done') + delta)
+
+
+def ancestors_of(issues):
+    """Ids of every ancestor of `issues` (a queryset). Usually just the epics and stories above them."""
+    return list(IssueClosure.objects.filter(descendant__in=issues).values_list('ancestor_id', flat=True).distinct())
+
+
+def refresh_done_rollups(ancestor_ids):
+    """Recount rollup_done for `ancestor_ids` in one UPDATE.
+
+    For set-based status changes (queryset.update) that bypass Issue.save();
+    collect the ids with ancestors_of() before the update.
+    """
+    done_below = (
+        IssueClosure.objects.filter(ancestor_id=OuterRef('pk'), descendant__status=Issue.Status.DONE)
+        .order_by().values('ancestor_id').annotate(n=Count('id')).values('n')
+    )
+    Issue.objects.filter(id__in=ancestor_ids).update(rollup_done=Coalesce(Subquery(done_below), Value(0)))
+
+
+def status_breakdown(issue):
+    """Descendant counts per status, e.g. {'TODO': 3, 'DONE': 5}, from one grouped query."""
+    rows = descendants(issue).order_by().values_list('status').annotate(n=Count('id'))
+    return dict(rows)
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from issues.models import Issue
+
+
+class Command(BaseCommand):
+    help = "Archive issues that have been DONE for longer than ISSUE_ARCHIVE_AFTER_DAYS, in small batches. Run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ISSUE_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.0, help="Pause between batches, to keep write locks short")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(days=opts['days'])
+        candidates = Issue.objects.archivable(cutoff)
+
+        if opts['dry_run']:
+            self.stdout.write(f"{candidates.count()} issue(s) would be archived")
+            return
+
+        total = 0
+        while True:
+            # Each batch is its own short UPDATE so boards keep working while this runs
+            ids = list(candidates.order_by('id').values_list('id', flat=True)[:opts['batch_size']])
+            if not ids:
+                break
+            # Re-applying the conditions skips anything reopened since the SELECT
+            total += candidates.filter(id__in=ids).update(archived_at=timezone.now())
+            if opts['sleep']:
+                time.sleep(opts['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} issue(s) done before {cutoff:%Y-%m-%d}"))
@@ -0,0 +1,95 @@
+import json
+import random
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from issues.benchmark import SCENARIOS, build_context, run_scenario, compare
+from issues.models import Project
+from issues.seeding import generate
+
+# Query counts: the same on every machine, so this one is committed
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+# Latencies: only meaningful on the machine that recorded them, so this one is not
+DEFAULT_LATENCY_BASELINE = Path(settings.BASE_DIR) / 'benchmark_latency.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and report p50/p95 latency and query counts for the main API scenarios. "
+        "Fails if query counts grew past benchmark_baseline.json. Latency is only checked once --save-baseline "
+        "has recorded it on this machine (benchmark_latency.json, not committed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=3)
+        parser.add_argument('--issues', type=int, default=500, help="Issues per project")
+        parser.add_argument('--comments', type=int, default=3)
+        parser.add_argument('--subtasks', type=int, default=2)
+        parser.add_argument('--members', type=int, default=10)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="Run only these scenarios (repeatable)")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Query count baseline to compare against")
+        parser.add_argument('--latency-baseline', default=str(DEFAULT_LATENCY_BASELINE), help="This machine's latency baseline")
+        parser.add_argument('--save-baseline', action='store_true', help="Overwrite both baselines with this run's results")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed p95 slowdown before failing (0.25 = 25%%)")
+        parser.add_argument('--min-delta-ms', type=float, default=5.0, help="p95 slowdowns smaller than this never fail")
+
+    def handle(self, *args, **opts):
+        # Never benchmark against the real database: the reorder/comment scenarios write
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        for alias in getattr(settings, 'REPLICA_DATABASES', []):
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            generate(
+                rng=random.Random(42),
+                projects=opts['projects'], issues=opts['issues'], comments=opts['comments'],
+                subtasks=opts['subtasks'], attachments=0, members=opts['members'],
+                batch_size=5000, prefix='BENCH',
+            )
+            user = Project.objects.order_by('id').first().owner
+            client = Client()
+            client.force_login(user)
+            ctx = build_context(user)
+
+            results = {}
+            for name in opts['scenario'] or SCENARIOS:
+                results[name] = run_scenario(client, ctx, SCENARIOS[name], opts['iterations'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        baseline_path = Path(opts['baseline'])
+        latency_path = Path(opts['latency_baseline'])
+        queries = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        latency = json.loads(latency_path.read_text()) if latency_path.exists() else {}
+        baseline = {name: {**queries.get(name, {}), **latency.get(name, {})} for name in results}
+
+        self.stdout.write(f"{'scenario':<16}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'base p95':>10}{'base q':>8}")
+        for name, r in results.items():
+            base = baseline[name]
+            self.stdout.write(
+                f"{name:<16}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['queries']:>10}"
+                f"{base.get('p95_ms', '-'):>10}{base.get('queries', '-'):>8}"
+            )
+
+        if opts['save_baseline']:
+            queries.update({name: {'queries': r['queries']} for name, r in results.items()})
+            latency.update({name: {'p50_ms': r['p50_ms'], 'p95_ms': r['p95_ms']} for name, r in results.items()})
+            for path, data in ((baseline_path, queries), (latency_path, latency)):
+                path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baselines saved to {baseline_path} and {latency_path}"))
+            return
+
+        if not latency:
+            self.stdout.write(f"No latency baseline at {latency_path}; checking query counts only")
+        regressions = compare(results, baseline, opts['tolerance'], opts['min_delta_ms'])
+        if regressions:
+            for name, message in regressions:
+                self.stderr.write(f"REGRESSION {name}: {message}")
+            raise CommandError(f"{len(regressions)} regression(s) against the baseline")
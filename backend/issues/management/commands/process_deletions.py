@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from issues.deletion import DELETION_LEASE, run_project_deletion
+from issues.models import ProjectDeletion
+
+
+class Command(BaseCommand):
+    help = "Delete projects queued for deletion, in bounded batches. Run from cron or a worker loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Issues per transaction")
+        parser.add_argument('--sleep', type=float, default=0.0, help="Pause between batches, to keep write locks short")
+        parser.add_argument(
+            '--lease', type=float, default=DELETION_LEASE.total_seconds(),
+            help="Seconds without progress after which a RUNNING job is taken over from its worker",
+        )
+
+    def handle(self, *args, **opts):
+        # RUNNING jobs are listed too: once their lease runs out, a crashed worker's job resumes here
+        jobs = ProjectDeletion.objects.filter(
+            status__in=[ProjectDeletion.Status.PENDING, ProjectDeletion.Status.RUNNING]
+        ).order_by('created_at')
+        lease = timedelta(seconds=opts['lease'])
+
+        for job in jobs:
+            self.stdout.write(f"Deleting {job.project_key} ({job.total_issues} issues)...")
+            if not run_project_deletion(job, batch_size=opts['batch_size'], sleep=opts['sleep'], lease=lease):
+                self.stdout.write("  skipped: another worker is running it")
+                continue
+            job.refresh_from_db()
+            self.stdout.write(self.style.SUCCESS(
+                f"  {job.deleted_issues} issues, {job.deleted_rows} related rows, {job.deleted_files} files"
+            ))
@@ -0,0 +1,34 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from issues.seeding import generate
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset (projects, issues, comments, subtasks, members, attachments) using bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=5)
+        parser.add_argument('--issues', type=int, default=200, help="Issues per project")
+        parser.add_argument('--comments', type=int, default=3, help="Comments per issue")
+        parser.add_argument('--subtasks', type=int, default=2, help="Subtasks per issue")
+        parser.add_argument('--attachments', type=int, default=0, help="Attachments per issue")
+        parser.add_argument('--members', type=int, default=10, help="Members per project (users are shared)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, so runs are repeatable")
+        parser.add_argument('--prefix', default='SEED', help="Prefix for generated project keys and usernames")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        rng = random.Random(opts['seed'])
+        with transaction.atomic():
+            counts = generate(rng=rng, stdout=self.stdout, **{
+                k: opts[k] for k in ('projects', 'issues', 'comments', 'subtasks', 'attachments', 'members', 'batch_size', 'prefix')
+            })
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        summary = ', '.join(f"{n} {name}" for name, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {total} rows in {elapsed:.1f}s ({summary})"))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from issues.notifications import fan_out_pending, send_digests
+
+
+class Command(BaseCommand):
+    help = "Fan out pending issue events to watchers and deliver one digest per recipient. Run from cron or with --loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Notification rows per insert")
+        parser.add_argument('--max-items', type=int, default=20, help="Items listed in one digest; the rest are summarised")
+        parser.add_argument('--loop', type=float, default=0, help="Keep running, sleeping this many seconds between passes")
+
+    def handle(self, *args, **opts):
+        while True:
+            created = fan_out_pending(batch_size=opts['batch_size'])
+            sent = send_digests(max_items=opts['max_items'])
+            if created or sent:
+                self.stdout.write(f"{created} notification(s) created, {sent} digest(s) sent")
+            if not opts['loop']:
+                break
+            time.sleep(opts['loop'])
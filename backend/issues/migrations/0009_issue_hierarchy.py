@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0008_issue_query_indexes_savedfilter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='issues.issue'),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='rollup_done',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='rollup_total',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='issue_type',
+            field=models.CharField(choices=[('BUG', 'Bug'), ('TASK', 'Task'), ('STORY', 'Story'), ('EPIC', 'Epic')], default='TASK', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='IssueClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='issues.issue')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='issues.issue')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='closure_descendant_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+    ]
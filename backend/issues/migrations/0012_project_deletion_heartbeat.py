@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0011_watchers_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectdeletion',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist # <--- 1. IMPORTANT IMPORT
@@ -12,10 +13,26 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     owner = models.ForeignKey(User, on_delete=models.PROTECT, related_name='owned_projects')
     members = models.ManyToManyField(User, related_name='joined_projects', blank=True)
+    # Set when deletion is requested; the rows are removed later by process_deletions
+    deleted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.name} ({self.key})"
 
+class IssueQuerySet(models.QuerySet):
+    # Hot/cold split: boards and stats only look at active issues
+    def active(self):
+        return self.filter(archived_at__isnull=True)
+
+    def archived(self):
+        return self.filter(archived_at__isnull=False)
+
+    def archivable(self, cutoff):
+        # Issues done before `cutoff`. Rows resolved before resolved_at existed fall back to updated_at.
+        return self.active().filter(status=Issue.Status.DONE).filter(
+            models.Q(resolved_at__lt=cutoff) | models.Q(resolved_at__isnull=True, updated_at__lt=cutoff)
+        )
+
 class Issue(models.Model):
     # Enums for Dropdowns (Keep it simple like Jira)
     class Priority(models.TextChoices):
@@ -34,6 +51,7 @@ class Issue(models.Model):
         BUG = 'BUG', 'Bug'
         TASK = 'TASK', 'Task'
         STORY = 'STORY', 'Story'
+        EPIC = 'EPIC', 'Epic'
 
     # Core Fields
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='issues')
@@ -58,17 +76,68 @@ class Issue(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     order = models.IntegerField(default=0)
 
+    # Archiving: set when the issue moves to DONE, and when archive_issues moves it out of the board
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    # Hierarchy (epic -> story -> task); see hierarchy.py for the closure table behind it
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
+    # Descendant counts, kept up to date incrementally (db_default so bulk inserts don't need them)
+    rollup_total = models.PositiveIntegerField(default=0, db_default=0, editable=False)
+    rollup_done = models.PositiveIntegerField(default=0, db_default=0, editable=False)
+
+    objects = IssueQuerySet.as_manager()
+
     class Meta:
         # Ensures PROJ-1 is unique within the project
         unique_together = ('project', 'key_id')
         ordering = ['order']
+        indexes = [
+            # Board query: active issues of one project in column order
+            models.Index(fields=['project', 'archived_at', 'order'], name='issue_board_idx'),
+            models.Index(fields=['status', 'resolved_at'], name='issue_resolved_idx'),
+            # Common query-language filters: "project = X AND status in (...)", "assignee = me"
+            models.Index(fields=['project', 'status'], name='issue_project_status_idx'),
+            models.Index(fields=['assignee', 'status'], name='issue_assignee_status_idx'),
+            models.Index(fields=['updated_at'], name='issue_updated_idx'),
+        ]
 
     def save(self, *args, **kwargs):
+        # Track when the issue was finished; reopening it brings it back to the board
+        if self.status == self.Status.DONE:
+            if self.resolved_at is None:
+                self.resolved_at = timezone.now()
+        else:
+            self.resolved_at = None
+            self.archived_at = None
+
         # Auto-generate the Issue Key ID (e.g., If PROJ has 5 issues, this becomes 6)
         if self.key_id is None:
             max_id = Issue.objects.filter(project=self.project).aggregate(models.Max('key_id'))['key_id__max']
             self.key_id = (max_id or 0) + 1
-        super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            # Compare against what is stored, not what this instance was loaded with:
+            # it may be stale or have deferred fields. The row lock keeps concurrent saves in order.
+            stored = None
+            if self.pk is not None:
+                stored = Issue.objects.select_for_update().filter(pk=self.pk).values(
+                    'parent_id', 'status', 'assignee_id',
+                ).first()
+            old_parent_id = stored['parent_id'] if stored else None
+            old_status = stored['status'] if stored else None
+            # Read by the notification receiver during super().save()
+            self._loaded_status = old_status
+            self._loaded_assignee_id = stored['assignee_id'] if stored else None
+
+            super().save(*args, **kwargs)
+
+            from .hierarchy import move, status_changed
+            if old_status is not None:
+                # Uses the current (old) links, so it must run before any move
+                status_changed(self, was_done=old_status == self.Status.DONE)
+            if old_parent_id != self.parent_id:
+                move(self, old_parent_id, self.parent_id)
 
     @property
     def key(self):
@@ -78,6 +147,18 @@ class Issue(models.Model):
     def __str__(self):
         return f"{self.key}: {self.title}"
 
+class IssueClosure(models.Model):
+    # Every (ancestor, descendant) pair in the issue hierarchy, at any depth
+    ancestor = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        indexes = [
+            models.Index(fields=['descendant', 'depth'], name='closure_descendant_idx'),
+        ]
+
 class Comment(models.Model):
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -104,6 +185,94 @@ class Attachment(models.Model):
     def __str__(self):
         return f"File for {self.issue.key}"
     
+class SavedFilter(models.Model):
+    # A named query-language search, e.g. "assignee = me AND status != DONE"
+    name = models.CharField(max_length=100)
+    jql = models.TextField()
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_filters')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='saved_filters')
+    shared = models.BooleanField(default=False, help_text="Visible to every member of the project")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+class ProjectDeletion(models.Model):
+    # Progress of a background project deletion. Plain ids, since the project row itself goes at the end.
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    project_id = models.IntegerField(db_index=True)
+    project_key = models.CharField(max_length=10)
+    project_name = models.CharField(max_length=100)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='project_deletions')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+
+    total_issues = models.PositiveIntegerField(default=0)
+    deleted_issues = models.PositiveIntegerField(default=0)
+    deleted_rows = models.PositiveIntegerField(default=0, help_text="Comments, subtasks, attachments and links")
+    deleted_files = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Renewed by the worker running the job after every batch; a RUNNING job whose
+    # heartbeat is older than the lease belongs to a dead worker and may be claimed again
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Deletion of {self.project_key} ({self.status})"
+
+class Watcher(models.Model):
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='watchers')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='watching')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('issue', 'user')
+
+    def __str__(self):
+        return f"{self.user} watches {self.issue_id}"
+
+class NotificationEvent(models.Model):
+    # Outbox: one row per change, written in the request. send_notifications fans it out to watchers later.
+    class Verb(models.TextChoices):
+        CREATED = 'CREATED', 'created'
+        UPDATED = 'UPDATED', 'updated'
+        STATUS = 'STATUS', 'changed the status of'
+        COMMENTED = 'COMMENTED', 'commented on'
+
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='notification_events')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    verb = models.CharField(max_length=10, choices=Verb.choices)
+    summary = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    fanned_out_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.actor} {self.get_verb_display()} {self.issue_id}"
+
+class Notification(models.Model):
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    event = models.ForeignKey(NotificationEvent, on_delete=models.CASCADE, related_name='notifications')
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when included in a delivered digest / when read in the app
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'delivered_at'], name='notification_pending_idx'),
+            models.Index(fields=['recipient', '-created_at'], name='notification_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.recipient} about {self.issue_id}"
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
@@ -123,4 +292,23 @@ def save_user_profile(sender, instance, **kwargs):
         instance.profile.save()
     except ObjectDoesNotExist:
         # If the user exists but has no profile (e.g. created before this feature), create one now.
-        Profile.objects.create(user=instance)
\ No newline at end of file
+        Profile.objects.create(user=instance)
+
+@receiver(pre_delete, sender=Issue)
+def detach_issue(sender, instance, **kwargs):
+    # Take the issue's subtree out of its ancestors' rollups; its children become top-level (SET_NULL)
+    if instance.parent_id is not None:
+        from .hierarchy import move
+        move(instance, instance.parent_id, None)
+
+
+@receiver(post_save, sender=Issue)
+def notify_issue_saved(sender, instance, created, **kwargs):
+    from .notifications import issue_saved
+    issue_saved(instance, created)
+
+@receiver(post_save, sender=Comment)
+def notify_comment_saved(sender, instance, created, **kwargs):
+    if created:
+        from .notifications import comment_created
+        comment_created(instance)
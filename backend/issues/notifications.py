@@ -0,0 +1,199 @@
+"""
+Issue watchers and notification delivery.
+
+Saves only write a single NotificationEvent row (an outbox), so a request
+costs the same whether an issue has 3 watchers or 30,000. The
+send_notifications command then:
+
+1. fans each event out into Notification rows, reading watchers in chunks
+   and inserting them with bulk_create, so memory stays bounded;
+2. coalesces each recipient's undelivered notifications into one digest and
+   hands it to the configured backend (NOTIFICATION_BACKEND).
+"""
+import sys
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Issue, Watcher, NotificationEvent, Notification
+
+
+# --- Watchers and events (called from the post_save receivers in models.py) --
+
+def watch(issue_id, *user_ids):
+    # Ids only, so saves never load the User rows just to follow an issue
+    user_ids = [pk for pk in user_ids if pk is not None]
+    if user_ids:
+        Watcher.objects.bulk_create(
+            [Watcher(issue_id=issue_id, user_id=pk) for pk in user_ids], ignore_conflicts=True,
+        )
+
+
+def watch_issues(queryset, user_id):
+    """Make user_id watch every issue in `queryset` with one INSERT ... SELECT, never loading the ids."""
+    connection = connections[queryset.db]
+    ops, qn = connection.ops, connection.ops.quote_name
+    subquery, params = queryset.order_by().values('pk').query.sql_with_params()
+    sql = '{} {} ({}, {}, {}) SELECT {}, %s, %s FROM {} WHERE {} IN ({}) {}'.format(
+        ops.insert_statement(on_conflict=OnConflict.IGNORE), qn(Watcher._meta.db_table),
+        qn('issue_id'), qn('user_id'), qn('created_at'), qn('id'), qn(Issue._meta.db_table), qn('id'), subquery,
+        ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, ops.adapt_datetimefield_value(timezone.now()), *params])
+
+
+def issue_saved(issue, created):
+    # The reporter follows new issues and the assignee follows once assigned; anyone who
+    # unwatches afterwards stays unwatched through later edits
+    if created:
+        watch(issue.pk, issue.reporter_id, issue.assignee_id)
+    elif issue.assignee_id != getattr(issue, '_loaded_assignee_id', None):
+        watch(issue.pk, issue.assignee_id)
+
+    if created:
+        verb, summary = NotificationEvent.Verb.CREATED, issue.title
+    elif getattr(issue, '_loaded_status', None) not in (None, issue.status):
+        verb, summary = NotificationEvent.Verb.STATUS, f"Now {issue.get_status_display()}"
+    else:
+        verb, summary = NotificationEvent.Verb.UPDATED, issue.title
+    # Views set _actor to the requesting user; creations default to the reporter
+    actor = getattr(issue, '_actor', None)
+    actor_id = actor.pk if actor else (issue.reporter_id if created else None)
+    NotificationEvent.objects.create(issue_id=issue.pk, actor_id=actor_id, verb=verb, summary=summary[:255])
+
+
+def comment_created(comment):
+    watch(comment.issue_id, comment.author_id)
+    NotificationEvent.objects.create(
+        issue_id=comment.issue_id, actor_id=comment.author_id,
+        verb=NotificationEvent.Verb.COMMENTED, summary=comment.text[:255],
+    )
+
+
+# --- Fan-out -------------------------------------------------------------------
+
+def fan_out(event, batch_size=1000):
+    """Create one Notification per watcher of event's issue (except the actor). Returns the count."""
+    # Only people who were watching when it happened
+    watchers = Watcher.objects.filter(issue_id=event.issue_id, created_at__lte=event.created_at).order_by('id')
+    if event.actor_id:
+        watchers = watchers.exclude(user_id=event.actor_id)
+
+    created = 0
+    batch = []
+    # iterator() streams watcher ids instead of loading every row at once
+    for user_id in watchers.values_list('user_id', flat=True).iterator(chunk_size=batch_size):
+        batch.append(Notification(recipient_id=user_id, event_id=event.id, issue_id=event.issue_id))
+        if len(batch) >= batch_size:
+            Notification.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        Notification.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def fan_out_pending(batch_size=1000, limit=500):
+    """Fan out up to `limit` events that have not been processed yet."""
+    total = 0
+    events = NotificationEvent.objects.filter(fanned_out_at__isnull=True).order_by('id')[:limit]
+    for event in events:
+        with transaction.atomic():
+            total += fan_out(event, batch_size)
+            NotificationEvent.objects.filter(pk=event.pk).update(fanned_out_at=timezone.now())
+    return total
+
+
+# --- Digests -------------------------------------------------------------------
+
+class Digest:
+    def __init__(self, recipient, notifications, total):
+        self.recipient = recipient
+        self.notifications = notifications
+        self.total = total
+
+    @property
+    def omitted(self):
+        return self.total - len(self.notifications)
+
+    def lines(self):
+        for n in self.notifications:
+            event = n.event
+            actor = event.actor.username if event.actor else 'Someone'
+            yield f"{n.issue.key}: {actor} {event.get_verb_display()} — {event.summary}"
+        if self.omitted:
+            yield f"...and {self.omitted} more"
+
+    def render(self):
+        header = f"{self.total} update(s) on issues you watch"
+        return '\n'.join([header] + [f"  {line}" for line in self.lines()])
+
+
+class BaseBackend:
+    def send(self, digest):
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    # Local stand-in: prints digests to stdout
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, digest):
+        self.stream.write(f"To: {digest.recipient.username}\n{digest.render()}\n\n")
+        self.stream.flush()
+
+
+class FileBackend(BaseBackend):
+    # Local stand-in: appends digests to NOTIFICATION_FILE_PATH
+    def send(self, digest):
+        with open(settings.NOTIFICATION_FILE_PATH, 'a', encoding='utf-8') as f:
+            f.write(f"[{timezone.now():%Y-%m-%d %H:%M:%S}] To: {digest.recipient.username}\n{digest.render()}\n\n")
+
+
+class EmailBackend(BaseBackend):
+    def send(self, digest):
+        from django.core.mail import send_mail
+        if digest.recipient.email:
+            send_mail("Updates on issues you watch", digest.render(), None, [digest.recipient.email])
+
+
+def get_backend():
+    return import_string(settings.NOTIFICATION_BACKEND)()
+
+
+def send_digests(backend=None, recipient_batch=200, max_items=20):
+    """Send one digest per recipient with undelivered notifications. Returns the number of digests sent."""
+    backend = backend or get_backend()
+    sent = 0
+    last_recipient = 0
+    while True:
+        # Walk recipients in id order, a page at a time
+        recipients = list(
+            Notification.objects.filter(delivered_at__isnull=True, recipient_id__gt=last_recipient)
+            .order_by('recipient_id').values_list('recipient_id', flat=True).distinct()[:recipient_batch]
+        )
+        if not recipients:
+            return sent
+        last_recipient = recipients[-1]
+
+        for recipient_id in recipients:
+            pending = Notification.objects.filter(recipient_id=recipient_id, delivered_at__isnull=True)
+            # Snapshot: anything created after this point goes in the next digest
+            snapshot = pending.aggregate(upto=Max('id'), total=Count('id'))
+            items = list(
+                pending.filter(id__lte=snapshot['upto'])
+                .select_related('recipient', 'event__actor', 'issue__project')
+                .order_by('-id')[:max_items]
+            )
+            if not items:
+                continue
+            backend.send(Digest(items[0].recipient, items, snapshot['total']))
+            pending.filter(id__lte=snapshot['upto']).update(delivered_at=timezone.now())
+            sent += 1
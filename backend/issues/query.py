@@ -0,0 +1,392 @@
+"""
+A small JQL-style issue query language.
+
+    status in (TODO, IN_PROG) AND assignee = me AND priority >= HIGH ORDER BY updated DESC
+
+Queries are parsed once into a CompiledQuery (cached by query text); the plan
+is then turned into an ORM filter per request, since values such as `me`
+depend on the requesting user.
+
+Grammar:
+    query    := [or_expr] [ORDER BY sort ("," sort)*]
+    or_expr  := and_expr (OR and_expr)*
+    and_expr := unary (AND unary)*
+    unary    := NOT unary | "(" or_expr ")" | clause
+    clause   := field op value | field [NOT] IN "(" value ("," value)* ")"
+              | field IS [NOT] EMPTY | field "~" value
+    sort     := field [ASC | DESC]
+"""
+import re
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Issue
+
+
+class QueryError(ValueError):
+    pass
+
+
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>!=|>=|<=|=|>|<|~)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s(),=!<>~"']+)
+    )''', re.VERBOSE)
+
+KEYWORDS = {'AND', 'OR', 'NOT', 'IN', 'IS', 'EMPTY', 'NULL', 'ORDER', 'BY', 'ASC', 'DESC'}
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise QueryError(f"Unexpected character at position {pos}: {text[pos]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            tokens.append(('value', re.sub(r'\\(.)', r'\1', value[1:-1])))
+        elif kind == 'word' and value.upper() in KEYWORDS:
+            tokens.append(('kw', value.upper()))
+        elif kind == 'word':
+            tokens.append(('value', value))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+# --- Fields -----------------------------------------------------------------
+# Each field knows its ORM lookup and how to turn query text into DB values.
+
+def ordinal_choices(choices):
+    # Accepts both the stored code ("IN_PROG") and the label ("In Progress")
+    lookup = {}
+    for code, label in choices:
+        lookup[code.upper()] = code
+        lookup[label.upper()] = code
+    return lookup
+
+
+def parse_when(text):
+    # Absolute ("2026-01-31", ISO datetime) or relative to now ("-7d", "-12h", "-2w")
+    rel = re.fullmatch(r'-(\d+)([hdw])', text)
+    if rel:
+        unit = {'h': 'hours', 'd': 'days', 'w': 'weeks'}[rel.group(2)]
+        return timezone.now() - timedelta(**{unit: int(rel.group(1))})
+    parsed = parse_datetime(text)
+    if parsed is None:
+        day = parse_date(text)
+        if day is None:
+            raise QueryError(f"Invalid date {text!r}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class Field:
+    ordered = False
+
+    def __init__(self, lookup, choices=None, kind='text'):
+        self.lookup = lookup
+        self.kind = kind
+        self.codes = ordinal_choices(choices) if choices else None
+        if choices:
+            # Workflow order for status, severity order for priority
+            self.ordered = True
+            self.order = [code for code, _ in choices]
+
+    def convert(self, raw):
+        if self.codes is not None:
+            code = self.codes.get(raw.upper())
+            if code is None:
+                raise QueryError(f"Unknown value {raw!r} for {self.lookup}")
+            return code
+        if self.kind == 'date':
+            return parse_when(raw)
+        if self.kind == 'int':
+            try:
+                return int(raw)
+            except ValueError:
+                raise QueryError(f"Expected a number, got {raw!r}")
+        return raw
+
+
+class UserField(Field):
+    # `me` resolves at execution time; anything else is a username
+    def condition(self, raw, user):
+        if raw.lower() in ('me', 'currentuser()'):
+            return Q(**{f'{self.lookup}_id': user.id if user else None})
+        return Q(**{f'{self.lookup}__username': raw})
+
+
+class ProjectField(Field):
+    # Project key ("PROJ") or numeric id
+    def condition(self, raw, user):
+        if raw.isdigit():
+            return Q(project_id=int(raw))
+        return Q(project__key__iexact=raw)
+
+
+class KeyField(Field):
+    # Issue key, e.g. PROJ-12
+    def condition(self, raw, user):
+        project_key, _, number = raw.rpartition('-')
+        if not project_key or not number.isdigit():
+            raise QueryError(f"Invalid issue key {raw!r}")
+        return Q(project__key__iexact=project_key, key_id=int(number))
+
+
+FIELDS = {
+    'project': ProjectField('project'),
+    'key': KeyField('key_id'),
+    'status': Field('status', Issue.Status.choices),
+    'priority': Field('priority', Issue.Priority.choices),
+    'type': Field('issue_type', Issue.IssueType.choices),
+    'issuetype': Field('issue_type', Issue.IssueType.choices),
+    'assignee': UserField('assignee'),
+    'reporter': UserField('reporter'),
+    'title': Field('title'),
+    'summary': Field('title'),
+    'description': Field('description'),
+    'text': Field('title'),
+    'created': Field('created_at', kind='date'),
+    'updated': Field('updated_at', kind='date'),
+    'resolved': Field('resolved_at', kind='date'),
+    'archived': Field('archived_at', kind='date'),
+    'id': Field('id', kind='int'),
+}
+FIELDS.update({
+    'created_at': FIELDS['created'],
+    'updated_at': FIELDS['updated'],
+    'resolved_at': FIELDS['resolved'],
+    'archived_at': FIELDS['archived'],
+})
+
+RANGE_LOOKUPS = {'>': 'gt', '>=': 'gte', '<': 'lt', '<=': 'lte'}
+
+
+def compile_clause(name, op, values, user):
+    field = FIELDS[name]
+
+    if op == 'empty':
+        return Q(**{f'{field.lookup}__isnull': True})
+
+    if isinstance(field, (UserField, ProjectField, KeyField)):
+        if op not in ('=', '!=', 'in'):
+            raise QueryError(f"{name} only supports =, != and IN")
+        cond = Q()
+        for raw in values:
+            cond |= field.condition(raw, user)
+        return ~cond if op == '!=' else cond
+
+    if op == '~' and (field.kind != 'text' or field.codes is not None):
+        raise QueryError(f"~ is only supported on text fields, not {name}")
+
+    converted = [field.convert(v) for v in values]
+
+    if op == '~':
+        cond = Q(**{f'{field.lookup}__icontains': converted[0]})
+        if name == 'text':
+            cond |= Q(description__icontains=converted[0])
+        return cond
+    if op == 'in':
+        return Q(**{f'{field.lookup}__in': converted})
+    if op == '=':
+        return Q(**{field.lookup: converted[0]})
+    if op == '!=':
+        return ~Q(**{field.lookup: converted[0]})
+
+    # Range operators
+    if field.ordered:
+        # Choice fields compare by position, so `priority >= HIGH` becomes an indexed IN (...)
+        idx = field.order.index(converted[0])
+        positions = {
+            '>': field.order[idx + 1:], '>=': field.order[idx:],
+            '<': field.order[:idx], '<=': field.order[:idx + 1],
+        }[op]
+        return Q(**{f'{field.lookup}__in': positions})
+    if field.kind == 'text':
+        raise QueryError(f"{op} is not supported on {name}")
+    return Q(**{f'{field.lookup}__{RANGE_LOOKUPS[op]}': converted[0]})
+
+
+# --- Parser -------------------------------------------------------------------
+# Produces a nested tuple plan: ('and', a, b), ('or', a, b), ('not', a), ('clause', field, op, values)
+
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self, kind=None, value=None):
+        if self.pos >= len(self.tokens):
+            return None
+        tok = self.tokens[self.pos]
+        if kind and tok[0] != kind:
+            return None
+        if value and tok[1] != value:
+            return None
+        return tok
+
+    def take(self, kind=None, value=None):
+        tok = self.peek(kind, value)
+        if tok is None:
+            found = self.tokens[self.pos][1] if self.pos < len(self.tokens) else 'end of query'
+            raise QueryError(f"Expected {value or kind}, found {found!r}")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        where = None
+        if self.pos < len(self.tokens) and not self.peek('kw', 'ORDER'):
+            where = self.or_expr()
+        order = []
+        if self.peek('kw', 'ORDER'):
+            self.take('kw', 'ORDER')
+            self.take('kw', 'BY')
+            order.append(self.sort())
+            while self.peek('punct', ','):
+                self.take('punct', ',')
+                order.append(self.sort())
+        if self.pos < len(self.tokens):
+            raise QueryError(f"Unexpected {self.tokens[self.pos][1]!r}")
+        return where, tuple(order)
+
+    def or_expr(self):
+        node = self.and_expr()
+        while self.peek('kw', 'OR'):
+            self.take()
+            node = ('or', node, self.and_expr())
+        return node
+
+    def and_expr(self):
+        node = self.unary()
+        while self.peek('kw', 'AND'):
+            self.take()
+            node = ('and', node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek('kw', 'NOT'):
+            self.take()
+            return ('not', self.unary())
+        if self.peek('punct', '('):
+            self.take()
+            node = self.or_expr()
+            self.take('punct', ')')
+            return node
+        return self.clause()
+
+    def field(self):
+        name = self.take('value')[1].lower()
+        if name not in FIELDS:
+            raise QueryError(f"Unknown field {name!r}")
+        return name
+
+    def clause(self):
+        name = self.field()
+
+        if self.peek('kw', 'IS'):
+            self.take()
+            negate = False
+            if self.peek('kw', 'NOT'):
+                self.take()
+                negate = True
+            if not (self.peek('kw', 'EMPTY') or self.peek('kw', 'NULL')):
+                raise QueryError("Expected EMPTY after IS")
+            self.take()
+            node = ('clause', name, 'empty', ())
+            return ('not', node) if negate else node
+
+        if self.peek('kw', 'NOT'):
+            self.take()
+            self.take('kw', 'IN')
+            return ('not', ('clause', name, 'in', self.value_list()))
+        if self.peek('kw', 'IN'):
+            self.take()
+            return ('clause', name, 'in', self.value_list())
+
+        op = self.take('op')[1]
+        return ('clause', name, op, (self.take('value')[1],))
+
+    def value_list(self):
+        self.take('punct', '(')
+        values = [self.take('value')[1]]
+        while self.peek('punct', ','):
+            self.take()
+            values.append(self.take('value')[1])
+        self.take('punct', ')')
+        return tuple(values)
+
+    def sort(self):
+        name = self.field()
+        descending = False
+        if self.peek('kw', 'ASC') or self.peek('kw', 'DESC'):
+            descending = self.take()[1] == 'DESC'
+        return name, descending
+
+
+class CompiledQuery:
+    """A parsed query. Cheap to apply repeatedly; holds no per-user state."""
+
+    def __init__(self, text, where, order):
+        self.text = text
+        self.where = where
+        self.order = order
+        # Validate every clause up front (unknown values, bad dates, unsupported operators)
+        self.condition(None)
+
+    def condition(self, user):
+        return self._build(self.where, user) if self.where else Q()
+
+    def _build(self, node, user):
+        if node[0] == 'and':
+            return self._build(node[1], user) & self._build(node[2], user)
+        if node[0] == 'or':
+            return self._build(node[1], user) | self._build(node[2], user)
+        if node[0] == 'not':
+            return ~self._build(node[1], user)
+        _, name, op, values = node
+        return compile_clause(name, op, values, user)
+
+    def apply(self, queryset, user):
+        queryset = queryset.filter(self.condition(user))
+        if not self.order:
+            return queryset
+        ordering = []
+        for name, descending in self.order:
+            field = FIELDS[name]
+            if field.ordered:
+                # Sort choice fields by workflow/severity position rather than alphabetically
+                alias = f'{name}_rank'
+                queryset = queryset.annotate(**{alias: Case(
+                    *[When(**{field.lookup: code}, then=Value(i)) for i, code in enumerate(field.order)],
+                    output_field=IntegerField(),
+                )})
+                ordering.append(f'-{alias}' if descending else alias)
+            elif isinstance(field, (UserField, ProjectField)):
+                lookup = f'{field.lookup}__username' if isinstance(field, UserField) else 'project__key'
+                ordering.append(f'-{lookup}' if descending else lookup)
+            else:
+                ordering.append(f'-{field.lookup}' if descending else field.lookup)
+        return queryset.order_by(*ordering, 'id')
+
+    def count(self, queryset, user):
+        # Counting never needs ORDER BY, annotations or serialization
+        return queryset.filter(self.condition(user)).order_by().count()
+
+
+@lru_cache(maxsize=512)
+def compile_query(text):
+    where, order = Parser(text).parse()
+    return CompiledQuery(text, where, order)
@@ -0,0 +1,131 @@
+"""
+Synthetic dataset generation, shared by `manage.py seed_data` and `manage.py benchmark_api`.
+
+Rows go in through bulk_create and raw executemany() rather than Model.save(),
+so a dataset of hundreds of thousands of rows takes seconds rather than minutes.
+"""
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from .models import Project, Issue, Comment, Subtask, Attachment, Profile
+
+WORDS = (
+    'login', 'board', 'sprint', 'api', 'cache', 'search', 'export', 'avatar',
+    'dashboard', 'upload', 'crash', 'timeout', 'layout', 'mobile', 'filter',
+    'report', 'email', 'billing', 'sync', 'drag', 'column', 'token', 'session',
+)
+
+
+def sentence(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def insert_rows(model, columns, rows, batch_size):
+    """executemany() plain tuples into model's table; returns the number of rows written."""
+    qn = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(model._meta.db_table), ', '.join(qn(c) for c in columns), ', '.join(['%s'] * len(columns)),
+    )
+    total = 0
+    with connection.cursor() as cursor:
+        for batch in chunked(rows, batch_size):
+            cursor.executemany(sql, batch)
+            total += len(batch)
+    return total
+
+
+def chunked(iterable, size):
+    # Yields lists of at most `size` items so inserts never build the whole dataset in memory
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def generate(rng, projects, issues, comments, subtasks, attachments, members, batch_size, prefix, stdout=None):
+    """Bulk-insert a synthetic dataset and return row counts per model.
+
+    Bulk inserts skip Model.save() and signals, so key_id and Profile rows are filled in here.
+    """
+    counts = {'users': 0, 'projects': 0, 'issues': 0, 'comments': 0, 'subtasks': 0, 'attachments': 0}
+
+    # 1. Users (one password hash for everyone; hashing per user would dominate the runtime)
+    password = make_password('password')
+    start = User.objects.filter(username__startswith=f'{prefix.lower()}_user').count()
+    new_users = [
+        User(username=f'{prefix.lower()}_user{start + i}', password=password, email=f'{prefix.lower()}_user{start + i}@example.com')
+        for i in range(max(members, 1))
+    ]
+    users = User.objects.bulk_create(new_users, batch_size=batch_size)
+    Profile.objects.bulk_create([Profile(user=u) for u in users], batch_size=batch_size)
+    counts['users'] = len(users)
+
+    # 2. Projects + memberships
+    offset = Project.objects.filter(key__startswith=prefix).count()
+    new_projects = [
+        Project(
+            name=f'{sentence(rng, 2)} {offset + i}',
+            key=f'{prefix}{offset + i}'[:10],
+            description=sentence(rng, 8),
+            owner=users[0],
+        )
+        for i in range(projects)
+    ]
+    project_objs = Project.objects.bulk_create(new_projects, batch_size=batch_size)
+    Membership = Project.members.through
+    Membership.objects.bulk_create(
+        [Membership(project_id=p.id, user_id=u.id) for p in project_objs for u in users[1:]],
+        batch_size=batch_size,
+    )
+    counts['projects'] = len(project_objs)
+
+    statuses = [c for c, _ in Issue.Status.choices]
+    priorities = [c for c, _ in Issue.Priority.choices]
+    types = [c for c, _ in Issue.IssueType.choices]
+    user_ids = [u.id for u in users]
+    titles = [sentence(rng, 5) for _ in range(500)]
+    bodies = [sentence(rng, 20) for _ in range(500)]
+    notes = [sentence(rng, 12) for _ in range(500)]
+    # Raw inserts skip auto_now/auto_now_add, so timestamps are written explicitly
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    # 3. Issues and their children, one project at a time to bound memory.
+    # ORM bulk_create spends most of its time preparing each field value, so rows go in as plain tuples.
+    for project in project_objs:
+        issue_rows = (
+            (project.id, rng.choice(titles), rng.choice(bodies), n + 1, rng.choice(types), rng.choice(priorities),
+             rng.choice(statuses), rng.choice(user_ids + [None]), rng.choice(user_ids), now, now, n)
+            for n in range(issues)
+        )
+        insert_rows(Issue, ['project_id', 'title', 'description', 'key_id', 'issue_type', 'priority', 'status',
+                            'assignee_id', 'reporter_id', 'created_at', 'updated_at', 'order'], issue_rows, batch_size)
+        issue_ids = list(Issue.objects.filter(project=project).order_by('key_id').values_list('id', flat=True))
+        counts['issues'] += len(issue_ids)
+
+        comment_rows = (
+            (issue_id, rng.choice(user_ids), rng.choice(notes), now)
+            for issue_id in issue_ids for _ in range(comments)
+        )
+        subtask_rows = (
+            (issue_id, rng.choice(titles), rng.random() < 0.5)
+            for issue_id in issue_ids for _ in range(subtasks)
+        )
+        # Only the DB row is generated; no file is written to MEDIA_ROOT
+        attachment_rows = (
+            (issue_id, f'attachments/seed_{issue_id}_{n}.txt', now)
+            for issue_id in issue_ids for n in range(attachments)
+        )
+        counts['comments'] += insert_rows(Comment, ['issue_id', 'author_id', 'text', 'created_at'], comment_rows, batch_size)
+        counts['subtasks'] += insert_rows(Subtask, ['issue_id', 'title', 'completed'], subtask_rows, batch_size)
+        counts['attachments'] += insert_rows(Attachment, ['issue_id', 'file', 'uploaded_at'], attachment_rows, batch_size)
+
+        if stdout is not None:
+            stdout.write(f"  {project.key}: {len(issue_ids)} issues")
+
+    return counts
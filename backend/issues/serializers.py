@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Project, Issue, Comment, Subtask, Attachment 
+from .models import Project, Issue, Comment, Subtask, Attachment, SavedFilter, ProjectDeletion, Notification
+from .query import compile_query, QueryError
+from .hierarchy import check_parent, check_children, HierarchyError
 
 # 1. DEFINE THIS AT THE VERY TOP (So other serializers can use it)
 class UserLiteSerializer(serializers.ModelSerializer):
@@ -50,11 +52,90 @@ class IssueSerializer(serializers.ModelSerializer):
     class Meta:
         model = Issue
         fields = '__all__'
-        read_only_fields = ['reporter', 'created_at']
+        read_only_fields = ['reporter', 'created_at', 'resolved_at', 'archived_at']
+
+    def validate_project(self, value):
+        if value.deleted_at is not None:
+            raise serializers.ValidationError("This project is being deleted")
+        return value
+
+    def validate(self, attrs):
+        # Epics hold stories/tasks, stories hold tasks/bugs; no cycles or cross-project parents
+        current = self.instance
+        # Check the values this save would produce without touching self.instance
+        issue = Issue(
+            pk=current.pk if current else None,
+            project=attrs.get('project', current.project if current else None),
+            issue_type=attrs.get('issue_type', current.issue_type if current else Issue.IssueType.TASK),
+        )
+        parent = attrs.get('parent', current.parent if current else None)
+        try:
+            check_parent(issue, parent)
+        except HierarchyError as e:
+            raise serializers.ValidationError({'parent': str(e)})
+        if current is not None:
+            # The new type/project must still fit the children underneath
+            try:
+                check_children(current, issue.issue_type, issue.project_id)
+            except HierarchyError as e:
+                field = 'project' if issue.project_id != current.project_id else 'issue_type'
+                raise serializers.ValidationError({field: str(e)})
+        return attrs
 
     def get_progress(self, obj):
         total = obj.subtasks.count()
         if total == 0:
             return None
         completed = obj.subtasks.filter(completed=True).count()
-        return {'total': total, 'completed': completed}
\ No newline at end of file
+        return {'total': total, 'completed': completed}
+
+class SavedFilterSerializer(serializers.ModelSerializer):
+    owner = UserLiteSerializer(read_only=True)
+
+    class Meta:
+        model = SavedFilter
+        fields = ['id', 'name', 'jql', 'project', 'shared', 'owner', 'created_at']
+        read_only_fields = ['owner', 'created_at']
+
+    def validate_project(self, value):
+        # Only projects you belong to: shared filters are listed to that project's members
+        user = self.context['request'].user
+        if value is not None and not (value.owner_id == user.id or value.members.filter(pk=user.pk).exists()):
+            raise serializers.ValidationError("You are not a member of this project")
+        return value
+
+    def validate_jql(self, value):
+        # Reject queries that would fail later, when the filter is run
+        try:
+            compile_query(value)
+        except QueryError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
+class ProjectDeletionSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProjectDeletion
+        fields = ['id', 'project_id', 'project_key', 'project_name', 'status', 'total_issues', 'deleted_issues',
+                  'deleted_rows', 'deleted_files', 'progress', 'error', 'created_at', 'finished_at']
+
+    def get_progress(self, obj):
+        # Fraction of issues removed so far (0.0 - 1.0)
+        if obj.status == ProjectDeletion.Status.DONE:
+            return 1.0
+        if not obj.total_issues:
+            return 0.0
+        return round(min(obj.deleted_issues / obj.total_issues, 1.0), 3)
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    actor = UserLiteSerializer(source='event.actor', read_only=True)
+    verb = serializers.CharField(source='event.get_verb_display', read_only=True)
+    summary = serializers.CharField(source='event.summary', read_only=True)
+    issue_key = serializers.CharField(source='issue.key', read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'issue', 'issue_key', 'actor', 'verb', 'summary', 'created_at', 'read_at']
@@ -1,3 +1,566 @@
-from django.test import TestCase
+import random
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.db_router import PIN_COOKIE, PrimaryReplicaRouter, _replica_reads_allowed
+from .admin import estimated_row_count
+from .benchmark import compare, percentile
+from .deletion import LeaseLost, claim_project_deletion, renew_lease, request_project_deletion
+from .query import QueryError, Parser, compile_query, tokenize
+from .models import (
+    Project, Issue, IssueClosure, Comment, ProjectDeletion, Watcher, NotificationEvent, Notification,
+)
+from .seeding import generate
+from .notifications import ConsoleBackend, fan_out, fan_out_pending, send_digests
+
+
+class HierarchyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='pw')
+        self.project = Project.objects.create(name='Proj', key='PROJ', owner=self.user)
+        self.client.force_login(self.user)
+
+    def issue(self, title, issue_type, parent=None, status=Issue.Status.TODO):
+        return Issue.objects.create(
+            project=self.project, title=title, issue_type=issue_type,
+            parent=parent, status=status, reporter=self.user,
+        )
+
+    def assertRollup(self, issue, total, done):
+        issue.refresh_from_db()
+        self.assertEqual((issue.rollup_total, issue.rollup_done), (total, done))
+
+    def assertLinks(self, *links):
+        rows = IssueClosure.objects.values_list('ancestor__title', 'descendant__title', 'depth')
+        self.assertEqual(set(rows), set(links))
+
+    def test_create_with_parent(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        story = self.issue('story', Issue.IssueType.STORY, epic)
+        self.issue('task', Issue.IssueType.TASK, story, Issue.Status.DONE)
+
+        self.assertLinks(('epic', 'story', 1), ('epic', 'task', 2), ('story', 'task', 1))
+        self.assertRollup(epic, 2, 1)
+        self.assertRollup(story, 1, 1)
+
+    def test_reparent_moves_subtree(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        other = self.issue('other', Issue.IssueType.EPIC)
+        story = self.issue('story', Issue.IssueType.STORY, epic)
+        self.issue('task', Issue.IssueType.TASK, story, Issue.Status.DONE)
+
+        story.parent = other
+        story.save()
+
+        self.assertLinks(('other', 'story', 1), ('other', 'task', 2), ('story', 'task', 1))
+        self.assertRollup(epic, 0, 0)
+        self.assertRollup(other, 2, 1)
+
+    def test_status_in_and_out_of_done(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        story = self.issue('story', Issue.IssueType.STORY, epic)
+        task = self.issue('task', Issue.IssueType.TASK, story)
+
+        task.status = Issue.Status.DONE
+        task.save()
+        self.assertRollup(epic, 2, 1)
+        self.assertRollup(story, 1, 1)
+
+        task.status = Issue.Status.REVIEW
+        task.save()
+        self.assertRollup(epic, 2, 0)
+        self.assertRollup(story, 1, 0)
+
+    def test_delete_detaches_subtree(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        story = self.issue('story', Issue.IssueType.STORY, epic)
+        task = self.issue('task', Issue.IssueType.TASK, story, Issue.Status.DONE)
+
+        response = self.client.delete(f'/api/issues/{story.id}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertLinks()
+        self.assertRollup(epic, 0, 0)
+        task.refresh_from_db()
+        self.assertIsNone(task.parent_id)
+
+    def test_save_with_deferred_fields_keeps_links(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        story = self.issue('story', Issue.IssueType.STORY, epic)
+
+        partial = Issue.objects.only('id', 'title').get(pk=story.pk)
+        partial.title = 'renamed'
+        partial.save()
+
+        self.assertLinks(('epic', 'renamed', 1))
+        self.assertRollup(epic, 1, 0)
+
+    def test_stale_save_relinks_to_written_parent(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        other = self.issue('other', Issue.IssueType.EPIC)
+        story = self.issue('story', Issue.IssueType.STORY, epic)
+        stale = Issue.objects.get(pk=story.pk)
+
+        story.parent = other
+        story.save()
+        # Writes parent=epic back; the closure table must follow
+        stale.save()
+
+        self.assertLinks(('epic', 'story', 1))
+        self.assertRollup(epic, 1, 0)
+        self.assertRollup(other, 0, 0)
+
+    def test_type_change_must_fit_children(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        self.issue('story', Issue.IssueType.STORY, epic)
+
+        response = self.client.patch(f'/api/issues/{epic.id}/', {'issue_type': 'BUG'}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('issue_type', response.json())
+
+    def test_project_change_with_children_is_rejected(self):
+        epic = self.issue('epic', Issue.IssueType.EPIC)
+        self.issue('story', Issue.IssueType.STORY, epic)
+        elsewhere = Project.objects.create(name='Other', key='OTH', owner=self.user)
+
+        response = self.client.patch(f'/api/issues/{epic.id}/', {'project': elsewhere.id}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.json())
+        epic.refresh_from_db()
+        self.assertEqual(epic.project_id, self.project.id)
+
+
+class ProjectDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='pw')
+        self.project = Project.objects.create(name='Proj', key='PROJ', owner=self.user)
+        self.issue = Issue.objects.create(project=self.project, title='Bug', reporter=self.user)
+        Comment.objects.create(issue=self.issue, author=self.user, text='hello')
+        self.client.force_login(self.user)
+
+    def test_deleted_project_rows_are_hidden_before_purge(self):
+        saved = self.client.post('/api/filters/', {'name': 'all', 'jql': 'status = TODO'}, content_type='application/json').json()
+        self.assertEqual(self.client.get(f"/api/filters/{saved['id']}/count/").json()['count'], 1)
+
+        response = self.client.delete(f'/api/projects/{self.project.id}/')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.client.get(f"/api/filters/{saved['id']}/count/").json()['count'], 0)
+        self.assertEqual(self.client.get(f'/api/comments/?issue={self.issue.id}').json(), [])
+        self.assertEqual(self.client.get(f'/api/issues/?project={self.project.id}').json(), [])
+        self.assertEqual(self.client.get('/api/projects/').json(), [])
+
+    def test_process_deletions_removes_rows(self):
+        job = self.client.delete(f'/api/projects/{self.project.id}/').json()
+
+        call_command('process_deletions', stdout=StringIO())
+
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        progress = self.client.get(f"/api/project-deletions/{job['id']}/").json()
+        self.assertEqual((progress['status'], progress['deleted_issues']), ('DONE', 1))
+
+    def test_overlapping_runs_do_not_share_a_job(self):
+        job = request_project_deletion(self.project, self.user)
+        # Another worker claimed it and is still heartbeating
+        self.assertIsNotNone(claim_project_deletion(job))
+
+        out = StringIO()
+        call_command('process_deletions', stdout=out)
+
+        self.assertIn('skipped', out.getvalue())
+        self.assertTrue(Issue.objects.filter(pk=self.issue.pk).exists())
+
+        # The other worker died: once its lease runs out the job is taken over
+        ProjectDeletion.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        call_command('process_deletions', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted_issues, job.total_issues), ('DONE', 1, 1))
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+
+    def test_worker_that_lost_its_lease_stops(self):
+        job = request_project_deletion(self.project, self.user)
+        beat = claim_project_deletion(job)
+        ProjectDeletion.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertIsNotNone(claim_project_deletion(job))
+
+        with self.assertRaises(LeaseLost):
+            renew_lease(job, beat)
+
+    def test_admin_delete_queues_background_deletion(self):
+        admin_user = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.client.force_login(admin_user)
+
+        response = self.client.post(f'/admin/issues/project/{self.project.id}/delete/', {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 302)
+        self.project.refresh_from_db()
+        self.assertIsNotNone(self.project.deleted_at)
+        self.assertTrue(Issue.objects.filter(pk=self.issue.pk).exists())
+        self.assertTrue(ProjectDeletion.objects.filter(project_id=self.project.id).exists())
+        self.assertEqual(self.client.get('/admin/issues/project/').context['cl'].result_count, 0)
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+    def route(self, model, allowed=True):
+        token = _replica_reads_allowed.set(allowed)
+        try:
+            return PrimaryReplicaRouter().db_for_read(model)
+        finally:
+            _replica_reads_allowed.reset(token)
+
+    def test_safe_reads_use_replica(self):
+        self.assertEqual(self.route(Issue), 'replica1')
+
+    def test_unsafe_requests_read_primary(self):
+        self.assertEqual(self.route(Issue, allowed=False), 'default')
+
+    def test_sessions_and_auth_stay_on_primary(self):
+        self.assertEqual(self.route(Session), 'default')
+        self.assertEqual(self.route(User), 'default')
+
+
+@skipUnless('replica1' in settings.DATABASES, "set DJANGO_REPLICA_DBS to test against a mirrored replica")
+class ReplicaMirrorTests(TransactionTestCase):
+    # replica1 is a TEST MIRROR of default, so both aliases see the same rows
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='pw')
+        project = Project.objects.create(name='Proj', key='PROJ', owner=self.user)
+        Issue.objects.create(project=project, title='Bug', reporter=self.user)
+        self.client.force_login(self.user)
+
+    def get_issues(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica1']) as replica:
+            response = self.client.get('/api/issues/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        return ' '.join(q['sql'] for q in primary), ' '.join(q['sql'] for q in replica)
+
+    def test_get_reads_issues_from_replica_and_session_from_primary(self):
+        primary, replica = self.get_issues()
+
+        self.assertIn('issues_issue', replica)
+        self.assertIn('django_session', primary)
+        self.assertNotIn('django_session', replica)
+        self.assertNotIn('auth_user', replica)
+
+    def test_write_pins_reads_to_primary(self):
+        issue = Issue.objects.get()
+        response = self.client.patch(f'/api/issues/{issue.id}/', {'title': 'Renamed'}, content_type='application/json')
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        primary, replica = self.get_issues()
+
+        self.assertEqual(replica, '')
+        self.assertIn('issues_issue', primary)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='pw')
+        project = Project.objects.create(name='Proj', key='PROJ', owner=self.user)
+        self.issue = Issue.objects.create(project=project, title='Old', status=Issue.Status.DONE, reporter=self.user)
+        Issue.objects.filter(pk=self.issue.pk).update(resolved_at=timezone.now() - timedelta(days=90))
+        self.client.force_login(self.user)
+
+    def archive(self):
+        call_command('archive_issues', stdout=StringIO())
+        self.issue.refresh_from_db()
+        return self.issue.archived_at
+
+    def test_unarchived_issue_is_not_archived_again_by_next_run(self):
+        self.assertIsNotNone(self.archive())
+
+        response = self.client.post(f'/api/issues/{self.issue.id}/unarchive/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.archive())
+        self.assertEqual([i['id'] for i in self.client.get('/api/issues/').json()], [self.issue.id])
+
+
+class IssueAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.project = Project.objects.create(name='Proj', key='PROJ', owner=self.admin_user)
+        self.issues = [
+            Issue.objects.create(project=self.project, title=f'Bug {n}', reporter=self.admin_user) for n in range(3)
+        ]
+        self.client.force_login(self.admin_user)
+
+    def test_reassign_makes_assignee_a_watcher(self):
+        bob = User.objects.create_user('bob', password='pw')
+        selected = [i.id for i in self.issues[:2]]
+
+        self.client.post('/admin/issues/issue/', {'action': 'reassign', '_selected_action': selected, 'assignee': 'bob'})
+
+        self.assertEqual(list(Issue.objects.filter(assignee=bob).order_by('id').values_list('id', flat=True)), selected)
+        self.assertEqual(sorted(Watcher.objects.filter(user=bob).values_list('issue_id', flat=True)), selected)
+
+    def test_reassign_select_all_runs_set_based(self):
+        bob = User.objects.create_user('bob', password='pw')
+        # Already bob's and unwatched: reassigning to bob again must not re-add him
+        Issue.objects.filter(pk=self.issues[0].pk).update(assignee=bob)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/admin/issues/issue/', {
+                'action': 'reassign', 'select_across': '1', 'index': '0',
+                '_selected_action': [self.issues[0].id], 'assignee': 'bob',
+            })
+
+        self.assertEqual(Issue.objects.filter(assignee=bob).count(), 3)
+        self.assertEqual(
+            sorted(Watcher.objects.filter(user=bob).values_list('issue_id', flat=True)),
+            [i.id for i in self.issues[1:]],
+        )
+        inserts = [q['sql'] for q in queries if 'issues_watcher' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('SELECT', inserts[0])
+
+    @skipUnless(connection.vendor == 'sqlite', "checks the SQLite statistics lookup")
+    def test_changelist_count_after_deletes(self):
+        Issue.objects.filter(pk=self.issues[-1].pk).delete()
+        # No ANALYZE yet: no estimate, so the changelist counts the rows
+        self.assertIsNone(estimated_row_count(Issue, 'default'))
+        self.assertEqual(self.client.get('/admin/issues/issue/').context['cl'].result_count, 2)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimated_row_count(Issue, 'default'), 2)
+
+
+class QueryLanguageTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw')
+        self.project = Project.objects.create(name='Proj', key='PROJ', owner=self.alice)
+        for title, status, priority, assignee, issue_type in [
+            ('login', 'TODO', 'LOW', self.alice, 'BUG'),
+            ('crash', 'IN_PROG', 'CRI', self.bob, 'BUG'),
+            ('docs', 'REVIEW', 'MED', None, 'TASK'),
+            ('deploy', 'DONE', 'HIGH', self.alice, 'STORY'),
+        ]:
+            Issue.objects.create(
+                project=self.project, title=title, status=status, priority=priority,
+                assignee=assignee, issue_type=issue_type, reporter=self.alice,
+            )
+        self.client.force_login(self.alice)
+
+    def titles(self, jql, user=None):
+        issues = compile_query(jql).apply(Issue.objects.all(), user or self.alice)
+        return list(issues.values_list('title', flat=True))
+
+    def assertMatches(self, jql, *titles, user=None):
+        self.assertEqual(sorted(self.titles(jql, user)), sorted(titles))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('title ~ "say \\"hi\\"" and priority>=high'), [
+            ('value', 'title'), ('op', '~'), ('value', 'say "hi"'),
+            ('kw', 'AND'), ('value', 'priority'), ('op', '>='), ('value', 'high'),
+        ])
+
+    def test_not_binds_tighter_than_and_than_or(self):
+        where, _ = Parser('status = TODO OR priority = LOW AND NOT type = BUG').parse()
+        self.assertEqual(where, ('or', ('clause', 'status', '=', ('TODO',)), (
+            'and', ('clause', 'priority', '=', ('LOW',)), ('not', ('clause', 'type', '=', ('BUG',))),
+        )))
+
+        self.assertMatches('status = TODO OR priority = CRI AND type = TASK', 'login')
+        self.assertMatches('(status = TODO OR priority = CRI) AND type = BUG', 'login', 'crash')
+        self.assertMatches('NOT status = TODO AND assignee IS EMPTY', 'docs')
+
+    def test_ordered_choice_range_becomes_in(self):
+        self.assertEqual(compile_query('priority >= high').condition(None), Q(priority__in=['HIGH', 'CRI']))
+        self.assertMatches('priority >= HIGH', 'crash', 'deploy')
+        # Labels work as well as codes
+        self.assertMatches('status < "In Review"', 'login', 'crash')
+
+    def test_me_is_the_requesting_user(self):
+        self.assertMatches('assignee = me', 'login', 'deploy')
+        self.assertMatches('assignee = me', 'crash', user=self.bob)
+        self.assertMatches('assignee in (bob, me)', 'login', 'crash', 'deploy')
+
+    def test_is_empty_and_is_not_empty(self):
+        self.assertMatches('assignee IS EMPTY', 'docs')
+        self.assertMatches('assignee IS NOT EMPTY', 'login', 'crash', 'deploy')
+
+    def test_relative_dates(self):
+        Issue.objects.filter(title='docs').update(created_at=timezone.now() - timedelta(days=10))
+
+        self.assertMatches('created < -7d', 'docs')
+        self.assertMatches('created >= -1w', 'login', 'crash', 'deploy')
+
+    def test_order_by_choice_rank(self):
+        self.assertEqual(self.titles('ORDER BY priority DESC'), ['crash', 'deploy', 'docs', 'login'])
+        self.assertEqual(self.titles('type = BUG OR type = TASK ORDER BY status'), ['login', 'crash', 'docs'])
+
+    def test_invalid_queries_return_400(self):
+        for jql in [
+            'colour = red',
+            'status = NOPE',
+            'created > yesterday',
+            'status ~ TODO',
+            'assignee > bob',
+            '(status = TODO',
+            'status = TODO priority = LOW',
+            'title = "unterminated',
+        ]:
+            with self.subTest(jql=jql):
+                with self.assertRaises(QueryError):
+                    compile_query(jql)
+                response = self.client.get('/api/issues/', {'jql': jql})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('jql', response.json())
+
+    def test_saved_filter_project_must_be_yours(self):
+        theirs = Project.objects.create(name='Theirs', key='THR', owner=self.bob)
+        payload = {'name': 'mine', 'jql': 'status = TODO', 'project': theirs.id}
+
+        response = self.client.post('/api/filters/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.json())
+
+        theirs.members.add(self.alice)
+        response = self.client.post('/api/filters/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw')
+        self.carol = User.objects.create_user('carol', password='pw')
+        self.project = Project.objects.create(name='Proj', key='PROJ', owner=self.alice)
+        self.issue = Issue.objects.create(project=self.project, title='Bug', reporter=self.alice, assignee=self.bob)
+
+    def watchers(self):
+        return set(Watcher.objects.filter(issue=self.issue).values_list('user__username', flat=True))
+
+    def test_reporter_assignee_and_commenters_watch(self):
+        self.assertEqual(self.watchers(), {'alice', 'bob'})
+
+        Comment.objects.create(issue=self.issue, author=self.carol, text='Seen it too')
+
+        self.assertEqual(self.watchers(), {'alice', 'bob', 'carol'})
+        event = NotificationEvent.objects.latest('id')
+        self.assertEqual((event.verb, event.actor), (NotificationEvent.Verb.COMMENTED, self.carol))
+
+    def test_unwatching_survives_later_edits(self):
+        self.client.force_login(self.alice)
+        self.client.delete(f'/api/issues/{self.issue.id}/watch/')
+
+        self.client.force_login(self.bob)
+        response = self.client.patch(f'/api/issues/{self.issue.id}/', {'title': 'Renamed'}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.watchers(), {'bob'})
+
+    def test_new_assignee_watches(self):
+        self.issue.assignee = self.carol
+        self.issue.save()
+
+        self.assertEqual(self.watchers(), {'alice', 'bob', 'carol'})
+
+    def test_save_does_not_load_users(self):
+        issue = Issue.objects.get(pk=self.issue.pk)
+        issue.title = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            issue.save()
+
+        self.assertFalse([q['sql'] for q in queries if 'auth_user' in q['sql']])
+
+    def test_fan_out_skips_actor_and_later_watchers(self):
+        event = NotificationEvent.objects.get(issue=self.issue, verb=NotificationEvent.Verb.CREATED)
+        # carol starts watching after the event happened
+        late = Watcher.objects.create(issue=self.issue, user=self.carol)
+        Watcher.objects.filter(pk=late.pk).update(created_at=event.created_at + timedelta(seconds=1))
+
+        self.assertEqual(fan_out(event, batch_size=1), 1)
+
+        self.assertEqual(list(Notification.objects.values_list('recipient__username', flat=True)), ['bob'])
+
+    def test_digest_is_a_snapshot_and_marks_delivery(self):
+        for n in range(3):
+            Comment.objects.create(issue=self.issue, author=self.alice, text=f'Update {n}')
+        fan_out_pending()
+        self.assertEqual(Notification.objects.filter(recipient=self.bob).count(), 4)
+        issue = self.issue
+
+        class ArrivingMidSend(ConsoleBackend):
+            # A notification that lands while the digest is being sent belongs to the next digest
+            def send(self, digest):
+                super().send(digest)
+                event = NotificationEvent.objects.create(issue=issue, actor=None, verb=NotificationEvent.Verb.UPDATED)
+                self.late = Notification.objects.create(recipient=digest.recipient, event=event, issue=issue)
+
+        backend = ArrivingMidSend(stream=StringIO())
+        self.assertEqual(send_digests(backend, max_items=2), 1)
+
+        output = backend.stream.getvalue()
+        self.assertIn('To: bob', output)
+        self.assertIn('4 update(s) on issues you watch', output)
+        self.assertIn('PROJ-1: alice commented on — Update 2', output)
+        self.assertIn('...and 2 more', output)
+        pending = Notification.objects.filter(recipient=self.bob, delivered_at__isnull=True)
+        self.assertEqual(list(pending.all()), [backend.late])
+
+        # The next run delivers only what arrived since
+        stream = StringIO()
+        self.assertEqual(send_digests(ConsoleBackend(stream=stream)), 1)
+        self.assertIn('1 update(s)', stream.getvalue())
+        self.assertFalse(pending.exists())
+
+
+class BenchmarkTests(TestCase):
+    def test_generate_row_counts(self):
+        counts = generate(
+            rng=random.Random(1), projects=2, issues=5, comments=3, subtasks=2, attachments=1,
+            members=4, batch_size=4, prefix='T',
+        )
+
+        self.assertEqual(counts, {
+            'users': 4, 'projects': 2, 'issues': 10, 'comments': 30, 'subtasks': 20, 'attachments': 10,
+        })
+        self.assertEqual(Issue.objects.filter(project__key='T0').count(), 5)
+        self.assertEqual(sorted(Issue.objects.filter(project__key='T1').values_list('key_id', flat=True)), [1, 2, 3, 4, 5])
+        self.assertEqual(Project.objects.get(key='T0').members.count(), 3)
+
+    def test_percentile(self):
+        samples = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(samples, 50), 2)
+        self.assertEqual(percentile(samples, 95), 5)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_compare(self):
+        results = {
+            'list': {'p50_ms': 40.0, 'p95_ms': 60.0, 'queries': 12},
+            'detail': {'p50_ms': 6.0, 'p95_ms': 9.6, 'queries': 9},
+            'new': {'p50_ms': 1.0, 'p95_ms': 1.0, 'queries': 1},
+        }
+        baseline = {
+            'list': {'p95_ms': 40.0, 'queries': 10},
+            # +37%, but under min_delta_ms: noise
+            'detail': {'p95_ms': 7.0, 'queries': 9},
+        }
+
+        self.assertEqual(compare(results, baseline, tolerance=0.25), [
+            ('list', 'queries 10 -> 12'), ('list', 'p95 40.0ms -> 60.0ms'),
+        ])
+        # A committed baseline without latencies only checks query counts
+        self.assertEqual(compare(results, {'list': {'queries': 12}}, tolerance=0.25), [])
@@ -2,6 +2,7 @@ from rest_framework import viewsets, permissions
 from rest_framework.decorators import action  # <--- CRITICAL IMPORT
 from rest_framework.response import Response  # <--- CRITICAL IMPORT
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, login, logout
@@ -10,17 +11,31 @@ from django.http import JsonResponse
 from django.db import IntegrityError
 import json
 from django.db.models import Q
+from django.utils import timezone
 from .models import Attachment, Subtask # <--- Import
 from .serializers import AttachmentSerializer, SubtaskSerializer # <--- Import
 
-from .models import Project, Issue, Comment
+from .models import Project, Issue, Comment, SavedFilter, ProjectDeletion, Watcher, Notification
+from .query import compile_query, QueryError
+from . import hierarchy
+from .deletion import delete_issue, request_project_deletion
 from .serializers import (
     ProjectSerializer, 
     IssueSerializer, 
     CommentSerializer, 
-    UserLiteSerializer
+    UserLiteSerializer,
+    SavedFilterSerializer,
+    ProjectDeletionSerializer,
+    NotificationSerializer,
 )
 
+def run_query(queryset, jql, user):
+    # Parsed plans are cached by compile_query, so repeated searches skip the parser
+    try:
+        return compile_query(jql).apply(queryset, user)
+    except QueryError as e:
+        raise ValidationError({'jql': str(e)})
+
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserLiteSerializer
@@ -60,11 +75,17 @@ class ProjectViewSet(viewsets.ModelViewSet):
     # 1. SECURITY: Only show projects I am part of
     def get_queryset(self):
         user = self.request.user
-        return Project.objects.filter(Q(owner=user) | Q(members=user)).distinct()
+        return Project.objects.filter(Q(owner=user) | Q(members=user), deleted_at__isnull=True).distinct()
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    # Hide the project now; process_deletions removes its rows in batches.
+    # Poll /api/project-deletions/<id>/ for progress.
+    def destroy(self, request, *args, **kwargs):
+        job = request_project_deletion(self.get_object(), request.user)
+        return Response(ProjectDeletionSerializer(job).data, status=202)
+
     # 2. ACTION: Invite a user
     @action(detail=True, methods=['post'])
     def add_member(self, request, pk=None):
@@ -89,14 +110,88 @@ class IssueViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(reporter=self.request.user)
 
+    def perform_update(self, serializer):
+        # Lets the notification event record who made the change
+        serializer.instance._actor = self.request.user
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        delete_issue(instance)
+
     def get_queryset(self):
-        queryset = Issue.objects.all()
+        # Issues of projects waiting for deletion are already gone as far as the API is concerned
+        queryset = Issue.objects.filter(project__deleted_at__isnull=True)
         # Filter by project ID (e.g., /api/issues/?project=2)
         project_id = self.request.query_params.get('project')
         if project_id:
             queryset = queryset.filter(project_id=project_id)
+
+        # Search covers archived issues too (e.g., /api/issues/?search=login)
+        search = self.request.query_params.get('search')
+        if search:
+            return queryset.filter(Q(title__icontains=search) | Q(description__icontains=search))
+
+        # Query language, e.g. /api/issues/?jql=status in (TODO, IN_PROG) AND assignee = me
+        # Like search it sees archived issues; add "archived IS EMPTY" to skip them.
+        jql = self.request.query_params.get('jql')
+        if jql:
+            return run_query(queryset, jql, self.request.user)
+
+        # Lists (board, dashboard) only read active issues; detail routes can still open archived ones
+        if self.action == 'list':
+            queryset = queryset.active()
         return queryset
 
+    # ARCHIVE: /api/issues/archived/?project=2
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).archived().order_by('-archived_at')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    # WATCHERS: /api/issues/5/watch/ (POST to follow, DELETE to stop)
+    @action(detail=True, methods=['post', 'delete'])
+    def watch(self, request, pk=None):
+        issue = self.get_object()
+        if request.method == 'POST':
+            Watcher.objects.get_or_create(issue=issue, user=request.user)
+        else:
+            Watcher.objects.filter(issue=issue, user=request.user).delete()
+        return Response({'watching': request.method == 'POST', 'watchers': issue.watchers.count()})
+
+    @action(detail=True, methods=['get'])
+    def watchers(self, request, pk=None):
+        issue = self.get_object()
+        users = User.objects.filter(watching__issue=issue).select_related('profile').order_by('username')
+        return Response(UserLiteSerializer(users, many=True, context={'request': request}).data)
+
+    # HIERARCHY: every issue below this one (any depth), from one closure-table lookup
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        issue = self.get_object()
+        queryset = hierarchy.descendants(issue).order_by('ancestor_links__depth', 'order')
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    # ROLLUP: /api/issues/5/rollup/ -> {"total": 8, "done": 5, "by_status": {"TODO": 3, "DONE": 5}}
+    @action(detail=True, methods=['get'])
+    def rollup(self, request, pk=None):
+        issue = self.get_object()
+        return Response({
+            'total': issue.rollup_total,
+            'done': issue.rollup_done,
+            'by_status': hierarchy.status_breakdown(issue),
+        })
+
+    @action(detail=True, methods=['post'])
+    def unarchive(self, request, pk=None):
+        issue = self.get_object()
+        # Restart the archive clock too, or the next archive_issues run takes it straight back
+        Issue.objects.filter(pk=issue.pk).update(archived_at=None, resolved_at=timezone.now())
+        issue.refresh_from_db()
+        return Response(self.get_serializer(issue).data)
+
     # --- THIS IS THE NEW ACTION ---
     @action(detail=False, methods=['post'])
     def bulk_update_order(self, request):
@@ -115,12 +210,97 @@ class CommentViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user)
 
     def get_queryset(self):
-        queryset = Comment.objects.all()
+        # Rows of projects waiting for deletion are hidden, as in IssueViewSet
+        queryset = Comment.objects.filter(issue__project__deleted_at__isnull=True)
         issue_id = self.request.query_params.get('issue')
         if issue_id:
             queryset = queryset.filter(issue_id=issue_id)
         return queryset.order_by('created_at')
 
+class SavedFilterViewSet(viewsets.ModelViewSet):
+    queryset = SavedFilter.objects.all()
+    serializer_class = SavedFilterSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    # Mine, plus filters shared in projects I belong to
+    def get_queryset(self):
+        user = self.request.user
+        my_projects = Project.objects.filter(Q(owner=user) | Q(members=user)).values('id')
+        queryset = SavedFilter.objects.filter(
+            Q(owner=user) | Q(shared=True, project__in=my_projects)
+        ).exclude(project__deleted_at__isnull=False).select_related('owner__profile')
+        project_id = self.request.query_params.get('project')
+        if project_id:
+            queryset = queryset.filter(project_id=project_id)
+        return queryset.order_by('name')
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    def filter_issues(self, saved):
+        queryset = Issue.objects.filter(project__deleted_at__isnull=True)
+        if saved.project_id:
+            queryset = queryset.filter(project_id=saved.project_id)
+        return queryset
+
+    # RESULTS: /api/filters/3/issues/
+    @action(detail=True, methods=['get'])
+    def issues(self, request, pk=None):
+        saved = self.get_object()
+        queryset = run_query(self.filter_issues(saved), saved.jql, request.user)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(IssueSerializer(page, many=True, context={'request': request}).data)
+        return Response(IssueSerializer(queryset, many=True, context={'request': request}).data)
+
+    # COUNT: /api/filters/3/count/ -> a single COUNT(*), no rows are transferred
+    @action(detail=True, methods=['get'])
+    def count(self, request, pk=None):
+        saved = self.get_object()
+        return Response({'id': saved.id, 'count': compile_query(saved.jql).count(self.filter_issues(saved), request.user)})
+
+    # COUNTS: /api/filters/counts/ -> badge numbers for every visible filter
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        return Response([
+            {'id': saved.id, 'count': compile_query(saved.jql).count(self.filter_issues(saved), request.user)}
+            for saved in self.get_queryset()
+        ])
+
+class ProjectDeletionViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ProjectDeletion.objects.all()
+    serializer_class = ProjectDeletionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ProjectDeletion.objects.filter(requested_by=self.request.user).order_by('-created_at')
+
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Notification.objects.all()
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    # My inbox, newest first: /api/notifications/?unread=1
+    def get_queryset(self):
+        queryset = Notification.objects.filter(
+            recipient=self.request.user, issue__project__deleted_at__isnull=True,
+        ).select_related(
+            'event__actor__profile', 'issue__project'
+        )
+        if self.request.query_params.get('unread'):
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset.order_by('-created_at')
+
+    def list(self, request, *args, **kwargs):
+        # Only the latest 100; older ones are still reachable by id
+        queryset = self.get_queryset()[:100]
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=False, methods=['post'])
+    def read_all(self, request):
+        updated = Notification.objects.filter(recipient=request.user, read_at__isnull=True).update(read_at=timezone.now())
+        return Response({'status': f'{updated} marked read'})
+
 # --- CUSTOM AUTH VIEWS ---
 
 class SubtaskViewSet(viewsets.ModelViewSet):
@@ -130,7 +310,7 @@ class SubtaskViewSet(viewsets.ModelViewSet):
 
     # Filter by issue: /api/subtasks/?issue=1
     def get_queryset(self):
-        queryset = Subtask.objects.all()
+        queryset = Subtask.objects.filter(issue__project__deleted_at__isnull=True)
         issue_id = self.request.query_params.get('issue')
         if issue_id:
             queryset = queryset.filter(issue_id=issue_id)
@@ -143,7 +323,7 @@ class AttachmentViewSet(viewsets.ModelViewSet):
     parser_classes = (MultiPartParser, FormParser) # Allow file uploads
 
     def get_queryset(self):
-        queryset = Attachment.objects.all()
+        queryset = Attachment.objects.filter(issue__project__deleted_at__isnull=True)
         issue_id = self.request.query_params.get('issue')
         if issue_id:
             queryset = queryset.filter(issue_id=issue_id)
@@ -1,14 +1,24 @@
 import React, { useState, useMemo, useEffect } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useMutation, useQueryClient, keepPreviousData } from '@tanstack/react-query';
 import { DndContext, closestCorners, useSensor, useSensors, PointerSensor } from '@dnd-kit/core';
 import { arrayMove } from '@dnd-kit/sortable';
-import { fetchIssues, updateIssueStatus, updateIssueOrder } from './api';
+import { fetchIssues, searchIssues, updateIssueStatus, updateIssueOrder } from './api';
 import Column from './Column';
 import EditIssueModal from './EditIssueModal';
 import CommentsModal from './CommentsModal';
 
 const STATUSES = ['TODO', 'IN_PROG', 'DONE'];
 
+// Turns the search box into a server-side query, so the board only downloads matching issues.
+// "archived IS EMPTY" keeps the board's usual view; "PROJ-12" also matches by key.
+const boardQuery = (search) => {
+  const text = search.trim();
+  if (!text) return null;
+  const quoted = `"${text.replace(/[\\"]/g, '\\$&')}"`;
+  const byKey = /^[A-Za-z0-9]+-\d+$/.test(text) ? ` OR key = ${text}` : '';
+  return `archived IS EMPTY AND (title ~ ${quoted}${byKey})`;
+};
+
 export default function Board({ search, projectId }) {
   const queryClient = useQueryClient();
   const [editingIssue, setEditingIssue] = useState(null);
@@ -20,11 +30,19 @@ export default function Board({ search, projectId }) {
   // NEW: Track where the drag started
   const [activeDragIssue, setActiveDragIssue] = useState(null);
 
+  // Wait for typing to pause before querying the server
+  const [jql, setJql] = useState(null);
+  useEffect(() => {
+    const timer = setTimeout(() => setJql(boardQuery(search || '')), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
+
   // Fetch from API
   const { data: serverIssues } = useQuery({
-    queryKey: ['issues', projectId], // Unique key per project
-    queryFn: () => fetchIssues(projectId), // Fetch specific project issues
+    queryKey: ['issues', projectId, jql], // Unique key per project and search
+    queryFn: () => (jql ? searchIssues(jql, projectId) : fetchIssues(projectId)),
     enabled: !!projectId, // Don't fetch if no project selected
+    placeholderData: keepPreviousData, // Keep the old cards on screen while a new search loads
     refetchInterval: 2000,
   });
 
@@ -40,19 +58,13 @@ export default function Board({ search, projectId }) {
     useSensor(PointerSensor, { activationConstraint: { distance: 5 } })
   );
 
-  const filteredIssues = useMemo(() => {
-    if (!search) return issues;
-    const lowerSearch = search.toLowerCase();
-    return issues.filter(i => i.title.toLowerCase().includes(lowerSearch) || i.key.toLowerCase().includes(lowerSearch));
-  }, [issues, search]);
-
   const columns = useMemo(() => {
     const cols = { TODO: [], IN_PROG: [], DONE: [] };
-    filteredIssues.forEach((issue) => {
+    issues.forEach((issue) => {
         if (cols[issue.status]) cols[issue.status].push(issue);
     });
     return cols;
-  }, [filteredIssues]);
+  }, [issues]);
 
   // --- DRAG HANDLERS ---
 
@@ -44,6 +44,13 @@ export const fetchIssues = async (projectId) => {
   return data;
 };
 
+// Server-side query language, e.g. "status in (TODO, IN_PROG) AND assignee = me"
+export const searchIssues = async (jql, projectId) => {
+  const params = projectId ? { jql, project: projectId } : { jql };
+  const { data } = await api.get('issues/', { params });
+  return data;
+};
+
 export const registerUser = async (username, password, email) => {
   const { data } = await api.post('auth/register/', { username, password, email });
   return data;
@@ -255,4 +262,4 @@ export const deleteAttachment = async (id) => {
   });
 };
 
-export default api;
\ No newline at end of file
+export default api;